@@ -4,26 +4,175 @@ Linked version of the BST ADT.
 -------------------------------------------------------
 """
 # pylint: disable=W0212
+from array import array
+from bisect import bisect_left
+from collections import deque
 from copy import deepcopy
+import gc
+import mmap
+from os import cpu_count
+import struct
+from sys import byteorder, getsizeof
+
+# marks the end of an element stream in the set operations
+_END = object()
+# passed to a node for "the data is its own key"; None cannot be used
+# as a key function may return None
+_NO_KEY = object()
+
+# dump/load file layout: a 16 byte header (magic, element type code,
+# element count) followed by the elements in increasing order, all
+# little-endian. Numbers are stored as one packed array; str and bytes
+# elements as an array of count + 1 offsets followed by the encoded data.
+_MAGIC = b"BST1"
+_HEADER = struct.Struct("<4sB3xQ")
+# dump type codes by exact element type; bool has its own code so
+# that load gives back bools, not 0 and 1
+_TYPE_CODES = {bool: b"?", int: b"q", float: b"d", str: b"s", bytes: b"y"}
+# range of the int elements dump can pack
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+def _count_true(func, values):
+    """
+    -------------------------------------------------------
+    Returns the number of values for which func is True. Runs
+    in a worker of count_apply, so it must be a module-level
+    function that process pools can pickle.
+    Use: number = _count_true(func, values)
+    -------------------------------------------------------
+    Parameters:
+        func - a function that returns True or False (function)
+        values - data elements (list of ?)
+    Returns:
+        number - count of values where func(value) is True (int)
+    -------------------------------------------------------
+    """
+    number = 0
+    for value in values:
+        if func(value):
+            number += 1
+    return number
+
+
+def _map_values(func, values):
+    """
+    -------------------------------------------------------
+    Returns func applied to each value. Runs in a worker of
+    apply, so it must be a module-level function.
+    Use: results = _map_values(func, values)
+    -------------------------------------------------------
+    Parameters:
+        func - a function of one data element (function)
+        values - data elements (list of ?)
+    Returns:
+        results - func(value) for each value, in order (list of ?)
+    -------------------------------------------------------
+    """
+    return [func(value) for value in values]
+
+# immutable types that deepcopy returns unchanged; skipping the call
+# for them makes creating nodes several times faster
+_ATOMIC = frozenset((int, float, complex, str, bytes, bool, type(None)))
 
 class BSTNode:
+    # Fixed attribute slots: nodes carry no per-instance __dict__,
+    # which roughly halves the memory used by each node.
+    __slots__ = ("_data", "_key", "_left", "_right", "_height", "_size")
 
-    def __init__(self, data):
+    def __init__(self, data, key=_NO_KEY):
         """
         -------------------------------------------------------
         Initializes a BST node containing the data. Child pointers
-        are None
+        are None. The node caches the key it is ordered by; without
+        a key the data is its own key.
         Use: node = BSTNode(element)
+        Use: node = BSTNode(element, key)
         -------------------------------------------------------
         Parameters:
             data - data for the node (?)
+            key - the key of data, omitted if data is its own key (?)
         Returns:
             A BSTNode object (BSTNode)
         -------------------------------------------------------
         """
-        self._data = deepcopy(data)
+        self._data = data if type(data) in _ATOMIC else deepcopy(data)
+        self._key = self._data if key is _NO_KEY else key
         self._left = None
         self._right = None     
+        self._height = 1
+        self._size = 1
+
+    def _take(self, other):
+        """
+        -------------------------------------------------------
+        Replaces the contents of the node - its data and key, but
+        not its links or cached values - with those of other. Node
+        classes that store more per node extend it.
+        Use: node._take(other)
+        -------------------------------------------------------
+        Parameters:
+            other - the node to take the contents of (BSTNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        self._data = other._data
+        self._key = other._key
+        return
+
+    def _swap(self, other):
+        """
+        -------------------------------------------------------
+        Exchanges the contents of the node - its data and key, but
+        not its links or cached values - with those of other. Node
+        classes that store more per node extend it, as for _take.
+        Use: node._swap(other)
+        -------------------------------------------------------
+        Parameters:
+            other - the node to exchange contents with (BSTNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        self._data, other._data = other._data, self._data
+        self._key, other._key = other._key, self._key
+        return
+
+    def _update(self):
+        """
+        -------------------------------------------------------
+        Recomputes the cached height and subtree size of the node
+        from the cached values of its children. Must be called
+        whenever a child pointer of the node changes; the BST
+        methods do so on every such node, in all modes and in
+        split and join, so node classes that cache more per node
+        extend it to keep that correct too.
+        Use: node._update()
+        -------------------------------------------------------
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        left = self._left
+        right = self._right
+        if left is None:
+            left_height = 0
+            size = 1
+        else:
+            left_height = left._height
+            size = left._size + 1
+        if right is None:
+            right_height = 0
+        else:
+            right_height = right._height
+            size += right._size
+        self._size = size
+        if left_height > right_height:
+            self._height = left_height + 1
+        else:
+            self._height = right_height + 1
+        return
     
     def __str__(self):
         """
@@ -38,6 +187,9 @@ class BSTNode:
 
 
 class BST:
+    # class of the nodes the tree creates; trees that store more
+    # per node replace it with a subclass of BSTNode
+    _node_class = BSTNode
     
     def display(self):
         self.display_aux("", self._root, 0)
@@ -63,17 +215,565 @@ class BST:
             self.display_aux(temp, T._left, 0) 
              
 
-    def __init__(self):
-        """
-        -------------------------------------------------------
-        Initializes an empty BST.
+    def __init__(self, balanced=False, splay=False, key=None):
+        """
+        -------------------------------------------------------
+        Initializes an empty BST. If balanced is True the tree
+        runs in AVL mode: insert, delete and remove_root rotate
+        nodes so that the heights of the two subtrees of every
+        node differ by at most 1, keeping all searches O(log n).
+        If splay is True the tree runs in splay mode instead: 
+        find, retrieve, __contains__ and insert rotate the node 
+        they reach up to the root, so frequently used elements 
+        stay near the top (O(log n) amortized per operation).
+        If key is given, elements are ordered by key(element): the
+        key of each element is computed once, cached in its node,
+        and only cached keys are compared. Elements with equal keys
+        count as the same element.
         Use: bst = BST()
+        Use: bst = BST(balanced=True)    # AVL mode
+        Use: bst = BST(splay=True)       # splay mode
+        Use: bst = BST(key=func)         # ordered by func(element)
         -------------------------------------------------------
+        Parameters:
+            balanced - True to keep the tree height balanced (boolean)
+            splay - True to move accessed nodes to the root (boolean)
+            key - a function of one element returning the value to
+                order it by, None to compare the elements (function)
         Returns:
             A BST object (BST)
         -------------------------------------------------------
         """
+        assert not (balanced and splay), "Choose AVL mode or splay mode, not both"
+
         self._root = None      
+        self._balanced = balanced
+        self._splaying = splay
+        self._keyfunc = key
+        # tree-wide aggregates kept up to date by the mutation methods
+        self._twos = 0            # number of nodes with two children
+        self._height_total = 0    # sum of the heights of all nodes
+        self._stale = False       # True if the aggregates need a recount
+
+    @classmethod
+    def from_sorted(cls, values, balanced=None, key=None):
+        """
+        -------------------------------------------------------
+        Creates a perfectly balanced BST from values that are 
+        already in increasing order (of key(value) if key is given).
+        Repeated values are stored once. Runs in O(n): every node is
+        created once and linked directly into place, with no 
+        searching or rebalancing.
+        Use: bst = BST.from_sorted(values)
+        -------------------------------------------------------
+        Parameters:
+            values - data elements in increasing order (iterable of ?)
+            balanced - True to create the tree in AVL mode, None for
+                the default mode of the class (boolean)
+            key - a function returning the value to order an element
+                by, None to compare the elements (function)
+        Returns:
+            bst - a balanced BST containing values (BST)
+        -------------------------------------------------------
+        """
+        nodes = []
+        # Creating millions of nodes would trigger many full passes of
+        # the cyclic garbage collector; the new nodes cannot form
+        # cycles, so pause it while they are created.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for value in values:
+                value_key = value if key is None else key(value)
+                if nodes:
+                    previous = nodes[-1]._key
+                    assert not value_key < previous, "Values must be in sorted order"
+                    if not previous < value_key:
+                        # repeated value
+                        continue
+                nodes.append(cls._node_class(value, _NO_KEY if key is None else value_key))
+        finally:
+            if collecting:
+                gc.enable()
+        if balanced is None:
+            # subclasses such as PersistentBST default to AVL mode
+            bst = cls(key=key)
+        else:
+            bst = cls(balanced=balanced, key=key)
+        bst._height_total = len(nodes)
+        bst._root = bst._build_balanced(nodes, 0, len(nodes))
+        return bst
+
+    @classmethod
+    def from_iterable(cls, values, balanced=None, key=None):
+        """
+        -------------------------------------------------------
+        Creates a perfectly balanced BST from values in any order.
+        Repeated values are stored once. Costs one sort, then O(n).
+        Use: bst = BST.from_iterable(values)
+        -------------------------------------------------------
+        Parameters:
+            values - comparable data elements (iterable of ?)
+            balanced - True to create the tree in AVL mode, None for
+                the default mode of the class (boolean)
+            key - a function returning the value to order an element
+                by, None to compare the elements (function)
+        Returns:
+            bst - a balanced BST containing values (BST)
+        -------------------------------------------------------
+        """
+        return cls.from_sorted(sorted(values, key=key), balanced=balanced, key=key)
+
+    def _build_balanced(self, nodes, low, high):
+        """
+        -------------------------------------------------------
+        Links nodes[low:high] into a perfectly balanced subtree by
+        making the middle node the root of its left and right 
+        halves. The recursion depth is only log2(n).
+        Use: node = self._build_balanced(nodes, low, high)
+        -------------------------------------------------------
+        Parameters:
+            nodes - unlinked nodes in increasing order (list of BSTNode)
+            low - index of the first node of the subtree (int)
+            high - index past the last node of the subtree (int)
+        Returns:
+            node - the root of the subtree, None if low >= high (BSTNode)
+        -------------------------------------------------------
+        """
+        node = None
+        if low < high:
+            middle = (low + high) // 2
+            node = nodes[middle]
+            node._left = self._build_balanced(nodes, low, middle)
+            node._right = self._build_balanced(nodes, middle + 1, high)
+            self._refresh(node)
+            if node._left is not None and node._right is not None:
+                self._twos += 1
+        return node
+
+    def union(self, other):
+        """
+        -------------------------------------------------------
+        Returns a new balanced BST containing the elements that
+        are in this BST, in other, or in both. The two inorder
+        streams are merged and the result built with from_sorted,
+        so the work is O(n + m). Neither tree is changed.
+        Use: target = bst.union(other)
+        -------------------------------------------------------
+        Parameters:
+            other - another BST (BST)
+        Returns:
+            target - the union of the two trees (BST)
+        -------------------------------------------------------
+        """
+        return self._merge(other, True, True, True)
+
+    def intersection(self, other):
+        """
+        -------------------------------------------------------
+        Returns a new balanced BST containing the elements that
+        are in both this BST and other. (O(n + m))
+        Use: target = bst.intersection(other)
+        -------------------------------------------------------
+        Parameters:
+            other - another BST (BST)
+        Returns:
+            target - the intersection of the two trees (BST)
+        -------------------------------------------------------
+        """
+        return self._merge(other, False, True, False)
+
+    def difference(self, other):
+        """
+        -------------------------------------------------------
+        Returns a new balanced BST containing the elements of this
+        BST that are not in other. (O(n + m))
+        Use: target = bst.difference(other)
+        -------------------------------------------------------
+        Parameters:
+            other - another BST (BST)
+        Returns:
+            target - this tree minus other (BST)
+        -------------------------------------------------------
+        """
+        return self._merge(other, True, False, False)
+
+    def _merge(self, other, keep_self, keep_both, keep_other):
+        """
+        -------------------------------------------------------
+        Merges the inorder streams of this BST and other, keeping
+        the elements found only in this BST, in both trees, or only
+        in other as requested, and builds a balanced BST from them.
+        The cached keys are compared, so both trees must be ordered
+        by the same key.
+        Private operation called by the set operations.
+        Use: target = self._merge(other, keep_self, keep_both, keep_other)
+        -------------------------------------------------------
+        Parameters:
+            other - another BST (BST)
+            keep_self - keep elements found only in this BST (boolean)
+            keep_both - keep elements found in both trees (boolean)
+            keep_other - keep elements found only in other (boolean)
+        Returns:
+            target - a balanced BST of the kept elements (BST)
+        -------------------------------------------------------
+        """
+        kept = []
+        mine = self._irange_nodes(None, None, False)
+        theirs = other._irange_nodes(None, None, False)
+        x = next(mine, _END)
+        y = next(theirs, _END)
+        while x is not _END and y is not _END:
+            if x._key < y._key:
+                if keep_self:
+                    kept.append(x)
+                x = next(mine, _END)
+            elif y._key < x._key:
+                if keep_other:
+                    kept.append(y)
+                y = next(theirs, _END)
+            else:
+                if keep_both:
+                    kept.append(x)
+                x = next(mine, _END)
+                y = next(theirs, _END)
+        if keep_self and x is not _END:
+            kept.append(x)
+            kept.extend(mine)
+        if keep_other and y is not _END:
+            kept.append(y)
+            kept.extend(theirs)
+
+        nodes = [self._clone(node) for node in kept]
+        target = self._empty()
+        target._height_total = len(nodes)
+        target._root = target._build_balanced(nodes, 0, len(nodes))
+        return target
+
+    def _clone(self, node):
+        """
+        -------------------------------------------------------
+        Returns a new unlinked node with a copy of the contents of
+        node. The cached key is reused rather than computed again.
+        Use: copy = self._clone(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node (BSTNode)
+        Returns:
+            copy - a new node with the same data and key (BSTNode)
+        -------------------------------------------------------
+        """
+        return self._node_class(node._data, _NO_KEY if self._keyfunc is None else node._key)
+
+    def _empty(self):
+        """
+        -------------------------------------------------------
+        Returns a new empty tree of the same class and mode.
+        Use: tree = self._empty()
+        -------------------------------------------------------
+        Returns:
+            tree - an empty tree (BST)
+        -------------------------------------------------------
+        """
+        tree = type(self)(balanced=self._balanced, key=self._keyfunc)
+        tree._splaying = self._splaying
+        return tree
+
+    def split(self, key):
+        """
+        -------------------------------------------------------
+        Splits the BST into two trees: one with the elements whose
+        keys are smaller than key and one with the rest. The nodes
+        are reused, not copied, and the work is O(log n) in AVL
+        mode. The BST is empty when the method ends.
+        Use: low, high = bst.split(key)
+        -------------------------------------------------------
+        Parameters:
+            key - the key to split at (?)
+        Returns:
+            low - the elements with keys smaller than key (BST)
+            high - the elements with keys >= key (BST)
+        -------------------------------------------------------
+        """
+        low_root, high_root = self._split(self._root, key)
+        low = self._empty()
+        low._root = low_root
+        low._stale = True
+        high = self._empty()
+        high._root = high_root
+        high._stale = True
+        self._root = None
+        self._recount()
+        return low, high
+
+    @classmethod
+    def join(cls, left, right):
+        """
+        -------------------------------------------------------
+        Joins two trees into one, where every element of left is
+        smaller than every element of right. The nodes are reused,
+        not copied, and the work is O(log n) in AVL mode. left and
+        right are empty when the method ends.
+        Use: bst = BST.join(left, right)
+        -------------------------------------------------------
+        Parameters:
+            left - the tree of smaller elements (BST)
+            right - the tree of larger elements (BST)
+        Returns:
+            bst - a tree with the elements of left and right (BST)
+        -------------------------------------------------------
+        """
+        assert left._precedes(right), "Trees must not overlap"
+
+        bst = left._empty()
+        bst._root = bst._join2(left._root, right._root)
+        bst._stale = True
+        left._root = None
+        left._recount()
+        right._root = None
+        right._recount()
+        return bst
+
+    def _precedes(self, other):
+        """
+        -------------------------------------------------------
+        Determines whether every key in this BST is smaller than
+        every key in other, by comparing the largest key of this
+        BST with the smallest key of other.
+        Use: b = self._precedes(other)
+        -------------------------------------------------------
+        Parameters:
+            other - another BST (BST)
+        Returns:
+            True if the trees do not overlap in that order (boolean)
+        -------------------------------------------------------
+        """
+        precedes = True
+        if self._root is not None and other._root is not None:
+            last = self._root
+            while last._right is not None:
+                last = last._right
+            first = other._root
+            while first._left is not None:
+                first = first._left
+            precedes = last._key < first._key
+        return precedes
+
+    def _join(self, left, node, right):
+        """
+        -------------------------------------------------------
+        Joins the subtrees left and right with node between them.
+        If one subtree is more than one level taller, node is hung
+        from its inner spine at the matching height and the spine
+        is then retraced, so the cost is the height difference.
+        Use: root = self._join(left, node, right)
+        -------------------------------------------------------
+        Parameters:
+            left - root of a subtree of smaller elements (BSTNode)
+            node - a node whose data lies between the subtrees (BSTNode)
+            right - root of a subtree of larger elements (BSTNode)
+        Returns:
+            root - the root of the joined subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        left_height = self._node_height(left)
+        right_height = self._node_height(right)
+        path = []
+        if left_height > right_height + 1:
+            # hang node from the right spine of left
+            while self._node_height(left) > right_height + 1:
+                path.append((left, False))
+                left = left._right
+        elif right_height > left_height + 1:
+            # hang node from the left spine of right
+            while self._node_height(right) > left_height + 1:
+                path.append((right, True))
+                right = right._left
+        node._left = left
+        node._right = right
+        self._refresh(node)
+        return self._relink(path, node)
+
+    def _join2(self, left, right):
+        """
+        -------------------------------------------------------
+        Joins the subtrees left and right, using the largest node
+        of left as the node between them.
+        Use: root = self._join2(left, right)
+        -------------------------------------------------------
+        Parameters:
+            left - root of a subtree of smaller elements (BSTNode)
+            right - root of a subtree of larger elements (BSTNode)
+        Returns:
+            root - the root of the joined subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        if left is None:
+            root = right
+        elif right is None:
+            root = left
+        else:
+            path = []
+            node = left
+            while node._right is not None:
+                path.append((node, False))
+                node = node._right
+            left = self._relink(path, node._left)
+            root = self._join(left, node, right)
+        return root
+
+    def _split(self, node, key):
+        """
+        -------------------------------------------------------
+        Splits the subtree rooted at node at key. Each ancestor on
+        the search path is joined, with its other subtree, onto the
+        low or the high side on the way back up.
+        Use: low, high = self._split(node, key)
+        -------------------------------------------------------
+        Parameters:
+            node - root of the subtree to split (BSTNode)
+            key - the key to split at (?)
+        Returns:
+            low - root of the elements with keys smaller than key (BSTNode)
+            high - root of the elements with keys >= key (BSTNode)
+        -------------------------------------------------------
+        """
+        path = []
+        while node is not None:
+            if key < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < key:
+                path.append((node, False))
+                node = node._right
+            else:
+                break
+        low = None
+        high = None
+        if node is not None:
+            low = node._left
+            high = self._join(None, node, node._right)
+        while path:
+            parent, is_left = path.pop()
+            if is_left:
+                high = self._join(high, parent, parent._right)
+            else:
+                low = self._join(parent._left, parent, low)
+        return low, high
+
+    def dump(self, path):
+        """
+        -------------------------------------------------------
+        Writes the elements of the BST to a file in a compact 
+        binary format: the sorted elements packed into one array
+        (bool, int, float) or an offset table plus encoded data
+        (str, bytes). Only the elements are written, not the tree
+        shape. All elements must be of one of these types, and all
+        of the same type: ints and floats cannot be mixed. Ints
+        must fit in 64 bits.
+        Use: bst.dump(path)
+        -------------------------------------------------------
+        Parameters:
+            path - name of the file to write (str)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        values = []
+        self._inorder_aux(self._root, values)
+        code = b"q"
+        if values:
+            kind = type(values[0])
+            code = _TYPE_CODES.get(kind)
+            assert code is not None, "Only bool, int, float, str and bytes elements can be dumped"
+            for value in values:
+                assert type(value) is kind, "All elements must be of the same type to be dumped"
+                assert kind is not int or _INT64_MIN <= value <= _INT64_MAX, \
+                    "Only int elements in the 64-bit range can be dumped"
+
+        if code == b"?":
+            payload = [array("B", values)]
+        elif code in (b"q", b"d"):
+            payload = [array(code.decode(), values)]
+        else:
+            if code == b"s":
+                values = [value.encode("utf-8") for value in values]
+            offsets = array("Q", [0])
+            total = 0
+            for value in values:
+                total += len(value)
+                offsets.append(total)
+            payload = [offsets]
+            values = [b"".join(values)]
+        if byteorder != "little":
+            for packed in payload:
+                packed.byteswap()
+
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, code[0], len(self)))
+            for packed in payload:
+                packed.tofile(f)
+            if code in (b"s", b"y"):
+                f.write(values[0])
+        return
+
+    @classmethod
+    def load(cls, path, balanced=None, use_mmap=True, key=None):
+        """
+        -------------------------------------------------------
+        Creates a perfectly balanced BST from a file written by
+        dump. The file is memory-mapped, the packed elements are
+        copied out of the mapping in bulk and handed to from_sorted,
+        so loading is O(n) with no per-node unpickling.
+        Use: bst = BST.load(path)
+        -------------------------------------------------------
+        Parameters:
+            path - name of a file written by dump (str)
+            balanced - True to create the tree in AVL mode, None for
+                the default mode of the class (boolean)
+            use_mmap - False to read the whole file into memory
+                instead of mapping it (boolean)
+            key - the key function of the dumped tree, None if its
+                elements were compared directly (function)
+        Returns:
+            bst - a balanced BST containing the dumped elements (BST)
+        -------------------------------------------------------
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+        try:
+            with memoryview(buffer) as view:
+                magic, code, n = _HEADER.unpack_from(view)
+                assert magic == _MAGIC, "Not a BST dump file"
+                code = bytes([code])
+                start = _HEADER.size
+                if code == b"?":
+                    values = [bool(value) for value in view[start:start + n]]
+                elif code in (b"q", b"d"):
+                    values = array(code.decode())
+                    values.frombytes(view[start:start + 8 * n])
+                    if byteorder != "little":
+                        values.byteswap()
+                else:
+                    offsets = array("Q")
+                    offsets.frombytes(view[start:start + 8 * (n + 1)])
+                    if byteorder != "little":
+                        offsets.byteswap()
+                    start += 8 * (n + 1)
+                    if code == b"s":
+                        values = [str(view[start + offsets[i]:start + offsets[i + 1]], "utf-8")
+                                  for i in range(n)]
+                    else:
+                        values = [bytes(view[start + offsets[i]:start + offsets[i + 1]])
+                                  for i in range(n)]
+        finally:
+            if use_mmap:
+                buffer.close()
+        bst = cls.from_sorted(values, balanced=balanced, key=key)
+        return bst
 
     def isEmpty(self):
         """
@@ -97,7 +797,7 @@ class BST:
             the number of nodes in bst.
         -------------------------------------------------------
         """
-        return self._count
+        return self._node_size(self._root)
 
     def __len__(self):
         """
@@ -109,15 +809,16 @@ class BST:
             the number of nodes in bst.
         -------------------------------------------------------
         """
-        return self._count
+        return self._node_size(self._root)
 
     def insert(self, element):
         """
         -------------------------------------------------------
         Inserts a copy of data element into BST. The data element
-        may appear only once in the tree. The main job is done
-        inside the recursive method _insert_aux. The BST tree is 
-        updated
+        may appear only once in the tree. The insertion point is 
+        found iteratively, remembering the path from the root, and
+        _retrace then updates the nodes on that path bottom-up. 
+        The BST tree is updated, and rebalanced in AVL mode.
         Use: bst.insert(element)
         -------------------------------------------------------
         Parameters:
@@ -126,37 +827,110 @@ class BST:
             None 
         -------------------------------------------------------
         """
-        self._root = self._insert_aux(self._root, element)
-        return None        
+        key = element if self._keyfunc is None else self._keyfunc(element)
+        _, added = self._add(element, key)
+        if not added:
+            print("The element is already in the tree")
+        return None
+
+    def _add(self, element, key):
+        """
+        -------------------------------------------------------
+        Returns the node with the given key, first adding a node 
+        for element if the BST has none. Private operation called 
+        by insert and the key-value updates of BSTMap.
+        Use: node, added = self._add(element, key)
+        -------------------------------------------------------
+        Parameters:
+            element - data to be inserted if key is not found (?)
+            key - the key of element (?)
+        Returns:
+            node - the node with key (BSTNode)
+            added - True if the node was added, False if it was 
+                already in the tree (boolean)
+        -------------------------------------------------------
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                # General case: check the left subtree.
+                path.append((node, True))
+                node = node._left
+            elif node._key < key:
+                # General case: check the right subtree.
+                path.append((node, False))
+                node = node._right
+            else:
+                return node, False
+        # Base case: add a new node containing the value.
+        node = self._node_class(element, _NO_KEY if self._keyfunc is None else key)
+        self._height_total += 1
+        if self._splaying and path:
+            # link the node in, then rotate it up to the root
+            self._relink(path[-1:], node)
+            self._splay(path, node)
+        else:
+            self._retrace(path, node)
+        return node, True
+
+    def _retrace(self, path, node):
+        """
+        -------------------------------------------------------
+        Links node into the tree as the new root of the subtree at
+        the bottom of path, then walks back up the path updating
+        the cached data of each ancestor (and rebalancing it in AVL
+        mode). Private operation called by the mutation methods.
+        Use: self._retrace(path, node)
+        -------------------------------------------------------
+        Parameters:
+            path - (parent, is_left) pairs from the root down to the
+                parent of the changed subtree (list of tuple)
+            node - the new root of the changed subtree (BSTNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        self._root = self._relink(path, node)
+        return
 
-    def _insert_aux(self, bstnode, element):
+    def _relink(self, path, node):
         """
         -------------------------------------------------------
-        Inserts a copy of the data element into the binary 
-        search tree rooted at bstnode. Private recursive 
-        operation called only by insert method.
-        Use: node = self._insert_aux(bstnode, element)
+        Links node in as the new root of the subtree at the bottom
+        of path and updates (and in AVL mode rebalances) each node 
+        on path bottom-up. Works on any subtree, not only the tree
+        rooted at _root.
+        Use: root = self._relink(path, node)
         -------------------------------------------------------
         Parameters:
-            bstnode - a BSTNode (BSTNode)
-            element - data element to be inserted into the 
-            subtree rooted at node (?)
+            path - (parent, is_left) pairs from the top of the subtree
+                down to the parent of the changed subtree (list of tuple)
+            node - the new root of the changed subtree (BSTNode)
         Returns:
-            node - the updated bstnode (BSTNode)            
+            node - the new root of the whole subtree (BSTNode)
         -------------------------------------------------------
         """
-        if bstnode is None:
-            # Base case: add a new node containing the value.
-            bstnode = BSTNode(element)
-        elif element < bstnode._data:
-            # General case: check the left subtree.
-            bstnode._left = self._insert_aux(bstnode._left, element)
-        elif element > bstnode._data:
-            # General case: check the right subtree.
-            bstnode._right = self._insert_aux(bstnode._right, element)
-        else:            
-            print("The element is already in the tree")                                                
-        return bstnode 
+        if path:
+            # only the bottom parent can gain or lose a child
+            parent, is_left = path[-1]
+            if is_left:
+                old, other = parent._left, parent._right
+            else:
+                old, other = parent._right, parent._left
+            if other is not None and (old is None) != (node is None):
+                self._twos += 1 if old is None else -1
+        while path:
+            parent, is_left = path.pop()
+            if is_left:
+                parent._left = node
+            else:
+                parent._right = node
+            self._refresh(parent)
+            if self._balanced:
+                parent = self._rebalance(parent)
+            node = parent
+        return node
     
     def find(self, element):
         """
@@ -173,19 +947,209 @@ class BST:
             the element is not found             
         -------------------------------------------------------
         """
+        if self._keyfunc is not None:
+            element = self._keyfunc(element)
+        return self.find_key(element)
+
+    def find_key(self, key):
+        """
+        -------------------------------------------------------
+        Returns the node in the BST whose element has the given
+        key. Only cached keys are compared, so no element needs to
+        be built to search for one. (Iterative)
+        Use: node = bst.find_key(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key to search for (?)
+        Returns:
+            node - The node containing an element with key, None if
+            there is no such element (BSTNode)
+        -------------------------------------------------------
+        """
+        if self._splaying:
+            return self._splay_find(key)
+
         node = self._root
-        
         while node is not None:
+            if key < node._key:
+                node = node._left
+            elif node._key < key:
+                node = node._right
+            else:
+                break
+        return node
+
+    def _key_of(self, element):
+        """
+        -------------------------------------------------------
+        Returns the key the BST orders element by.
+        Use: key = self._key_of(element)
+        -------------------------------------------------------
+        Parameters:
+            element - a data element (?)
+        Returns:
+            key - key(element), or element itself if the BST has no
+                key function (?)
+        -------------------------------------------------------
+        """
+        return element if self._keyfunc is None else self._keyfunc(element)
 
-            if node._data > element:
+    def _splay_find(self, key):
+        """
+        -------------------------------------------------------
+        Searches for key and splays the node containing it - or,
+        if it is not found, the last node on the search path - to
+        the root. Private operation used in splay mode.
+        Use: node = self._splay_find(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key to search for (?)
+        Returns:
+            node - The node containing key, None if key is not 
+            found (BSTNode)
+        -------------------------------------------------------
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                path.append((node, True))
                 node = node._left
-            elif node._data < element:
+            elif node._key < key:
+                path.append((node, False))
                 node = node._right
             else:
-                if node._data==element:
-                    return node 
-                           
-        return None
+                break
+        if node is not None:
+            self._splay(path, node)
+        elif path:
+            last, _ = path.pop()
+            self._splay(path, last)
+        return node
+
+    def _splay(self, path, node):
+        """
+        -------------------------------------------------------
+        Moves node to the root with zig-zig and zig-zag double
+        rotations (and a final single rotation if needed), which
+        also roughly halves the depth of every node on path.
+        Private operation used in splay mode.
+        Use: self._splay(path, node)
+        -------------------------------------------------------
+        Parameters:
+            path - (ancestor, is_left) pairs from the root down to
+                the parent of node (list of tuple)
+            node - the node to move to the root (BSTNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        while path:
+            parent, parent_left = path.pop()
+            if not path:
+                # zig
+                if parent_left:
+                    node = self._rotate_right(parent)
+                else:
+                    node = self._rotate_left(parent)
+            else:
+                grand, grand_left = path.pop()
+                if grand_left == parent_left:
+                    # zig-zig: rotate the grandparent first
+                    if parent_left:
+                        self._rotate_right(grand)
+                        node = self._rotate_right(parent)
+                    else:
+                        self._rotate_left(grand)
+                        node = self._rotate_left(parent)
+                else:
+                    # zig-zag
+                    if parent_left:
+                        grand._right = self._rotate_right(parent)
+                        node = self._rotate_left(grand)
+                    else:
+                        grand._left = self._rotate_left(parent)
+                        node = self._rotate_right(grand)
+                if path:
+                    above, above_left = path[-1]
+                    if above_left:
+                        above._left = node
+                    else:
+                        above._right = node
+        self._root = node
+        return
+
+    def find_many(self, elements):
+        """
+        -------------------------------------------------------
+        Finds many elements in one coordinated traversal. The probes
+        are sorted, and each node splits the batch it receives (with
+        bisect) into the probes that continue left, those that match
+        the node and those that continue right. Nodes shared by many
+        search paths are visited once instead of once per probe.
+        Use: nodes = bst.find_many(elements)
+        -------------------------------------------------------
+        Parameters:
+            elements - elements to search for (iterable of ?)
+        Returns:
+            nodes - for each element, in the order given, the node
+                containing it or None if it is not found (list of BSTNode)
+        -------------------------------------------------------
+        """
+        keys = [self._key_of(element) for element in elements]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        probes = [keys[i] for i in order]
+        found = [None] * len(probes)
+
+        # each entry is a node and the slice of probes that reach it
+        stack = []
+        if self._root is not None and probes:
+            stack.append((self._root, 0, len(probes)))
+        while stack:
+            node, low, high = stack.pop()
+            if high - low == 1:
+                # a single probe left: finish with a plain descent
+                probe = probes[low]
+                while node is not None:
+                    if probe < node._key:
+                        node = node._left
+                    elif node._key < probe:
+                        node = node._right
+                    else:
+                        found[low] = node
+                        break
+                continue
+            key = node._key
+            middle = bisect_left(probes, key, low, high)
+            end = middle
+            while end < high and not key < probes[end]:
+                found[end] = node
+                end += 1
+            if low < middle and node._left is not None:
+                stack.append((node._left, low, middle))
+            if end < high and node._right is not None:
+                stack.append((node._right, end, high))
+
+        nodes = [None] * len(keys)
+        for position, i in enumerate(order):
+            nodes[i] = found[position]
+        return nodes
+
+    def contains_many(self, elements):
+        """
+        -------------------------------------------------------
+        Determines for many elements at once whether each is in 
+        the BST, using the batched traversal of find_many.
+        Use: flags = bst.contains_many(elements)
+        -------------------------------------------------------
+        Parameters:
+            elements - elements to search for (iterable of ?)
+        Returns:
+            flags - for each element, in the order given, True if the
+                bst contains it, False otherwise (list of boolean)
+        -------------------------------------------------------
+        """
+        return [node is not None for node in self.find_many(elements)]
 
     def findMin(self, bstnode):
         """
@@ -215,7 +1179,9 @@ class BST:
         """
         -------------------------------------------------------
         deletes the node containing the given element from BST.
-        The job of deleting is done in _delete_aux method. 
+        A node with two children takes the data of its inorder 
+        successor, which is then removed instead. The search is 
+        iterative and _retrace updates the nodes on the path.
         Updates structure of BST as required.
         Use: bst.delete(element)
         -------------------------------------------------------
@@ -225,44 +1191,182 @@ class BST:
             None
         -------------------------------------------------------
         """
-        self._root = self._delete_aux(self._root, element)
-        return 
+        if self._keyfunc is not None:
+            element = self._keyfunc(element)
+        self._delete(element)
+        return
 
-    def _delete_aux(self, bstnode, element):         
+    def delete_key(self, key):
         """
         -------------------------------------------------------
-        deletes the node containing the data element in the
-        subtree rooted at bstnode. Updates structure of BST as 
-        required. Private recursive method called by delete.
-        Use: bstnode = self._delete_aux(bstnode, element)
+        Deletes the element with the given key from the BST, as
+        delete does, without building an element to delete.
+        Use: bst.delete_key(key)
         -------------------------------------------------------
         Parameters:
-            bstnode - a node in the BST (BSTNode)
-            element - data element in the node to be removed (?)
+            key - key of the element to be deleted (?)
         Returns:
-            bstnode - the updated bstnode
+            None
         -------------------------------------------------------
         """
-        if bstnode is None: #BST is empty
-            return bstnode
-        elif element < bstnode._data:
-            bstnode._left = self._delete_aux(bstnode._left, element)
-        elif element > bstnode._data:
-            bstnode._right = self._delete_aux(bstnode._right, element)
-        else:   #node to be deleted is found                        
-            if bstnode._left and bstnode._right: #node has two children                
-                #replace with smallest in right subtree
-                tempNode = self.findMin( bstnode._right )
-                bstnode._data = tempNode._data
-                bstnode._right = self._delete_aux(bstnode._right, bstnode._data)
-                print("tempNode._data=", tempNode._data)
-            else: #node has zero or one child
-                tempNode = bstnode
-                if bstnode._left is None:
-                    bstnode = bstnode._right
-                elif bstnode._right is None:
-                    bstnode = bstnode._left                                                            
-        return bstnode
+        self._delete(key)
+        return
+
+    def _delete(self, key):
+        """
+        -------------------------------------------------------
+        Deletes the node whose element has the given key. Private
+        operation called by delete and remove_root.
+        Use: removed = self._delete(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key of the element to be deleted (?)
+        Returns:
+            removed - the unlinked node, holding the deleted element,
+                None if key is not in the BST (BSTNode)
+        -------------------------------------------------------
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < key:
+                path.append((node, False))
+                node = node._right
+            else:
+                break
+        if node is None:
+            # key is not in the BST
+            return None
+
+        if node._left is not None and node._right is not None:
+            # node has two children: replace with smallest in right
+            # subtree, whose node then holds the deleted element
+            path.append((node, False))
+            successor = node._right
+            while successor._left is not None:
+                path.append((successor, True))
+                successor = successor._left
+            node._swap(successor)
+            node = successor
+            replacement = successor._right
+        elif node._left is None:
+            replacement = node._right
+        else:
+            replacement = node._left
+        self._height_total -= node._height
+        self._retrace(path, replacement)
+        return node
+
+    def _refresh(self, node):
+        """
+        -------------------------------------------------------
+        Updates the cached values of node after one of its child
+        pointers changed, keeping the sum of node heights current.
+        Use: self._refresh(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node (BSTNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        height = node._height
+        node._update()
+        self._height_total += node._height - height
+        return
+
+    def _balance(self, node):
+        """
+        -------------------------------------------------------
+        Returns the balance factor of node: the height of its left
+        subtree minus the height of its right subtree.
+        Use: b = self._balance(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node (BSTNode)
+        Returns:
+            balance - the balance factor of node (int)
+        -------------------------------------------------------
+        """
+        return self._node_height(node._left) - self._node_height(node._right)
+
+    def _rotate_left(self, node):
+        """
+        -------------------------------------------------------
+        Rotates the subtree rooted at node to the left. The right
+        child of node becomes the root of the subtree.
+        Use: node = self._rotate_left(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node with a right child (BSTNode)
+        Returns:
+            pivot - the new root of the subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        pivot = node._right
+        a = node._left is not None
+        b = pivot._left is not None
+        c = pivot._right is not None
+        self._twos += (a and b) + c - a - (b and c)
+        node._right = pivot._left
+        pivot._left = node
+        self._refresh(node)
+        self._refresh(pivot)
+        return pivot
+
+    def _rotate_right(self, node):
+        """
+        -------------------------------------------------------
+        Rotates the subtree rooted at node to the right. The left
+        child of node becomes the root of the subtree.
+        Use: node = self._rotate_right(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node with a left child (BSTNode)
+        Returns:
+            pivot - the new root of the subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        pivot = node._left
+        a = pivot._left is not None
+        b = pivot._right is not None
+        c = node._right is not None
+        self._twos += a + (b and c) - (a and b) - c
+        node._left = pivot._right
+        pivot._right = node
+        self._refresh(node)
+        self._refresh(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        """
+        -------------------------------------------------------
+        Restores the AVL property at node, assuming both of its
+        subtrees are already AVL trees and their heights differ
+        by at most 2. Heights must already be up to date.
+        Use: node = self._rebalance(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node (BSTNode)
+        Returns:
+            node - the new root of the subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        balance = self._balance(node)
+        if balance > 1:
+            if self._balance(node._left) < 0:
+                # left-right case
+                node._left = self._rotate_left(node._left)
+            node = self._rotate_right(node)
+        elif balance < -1:
+            if self._balance(node._right) > 0:
+                # right-left case
+                node._right = self._rotate_right(node._right)
+            node = self._rotate_left(node)
+        return node
 
     def inorder(self):
         """
@@ -284,7 +1388,7 @@ class BST:
         ---------------------------------------------------------
         Traverses subtree rooted at node in inorder. 
         a contains the contents subtree rooted at node and in inorder.
-        Private recursive operation called only by inorder.
+        Private iterative operation called only by inorder.
         Use: self._inorder_aux(node, a)
         ---------------------------------------------------------
         Parameters:
@@ -294,12 +1398,90 @@ class BST:
             None
         ---------------------------------------------------------
         """
-        if node is not None:
-            self._inorder_aux(node._left, a)
-            a.append(node._data)
-            self._inorder_aux(node._right, a)
+        stack = []
+        while node is not None or stack:
+            if node is not None:
+                stack.append(node)
+                node = node._left
+            else:
+                node = stack.pop()
+                a.append(node._data)
+                node = node._right
         return
 
+    def irange(self, low=None, high=None, reverse=False):
+        """
+        -------------------------------------------------------
+        Generates the elements e of the tree with low <= e <= high
+        (comparing keys if the BST has a key function) in inorder 
+        (or reverse inorder), without building a list. Subtrees 
+        that lie outside the bounds are never visited, so a scan of
+        k elements costs O(height + k) time and the explicit stack
+        O(height) memory.
+        Use: for element in bst.irange(low, high):
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound key, None for no lower bound (?)
+            high - upper bound key, None for no upper bound (?)
+            reverse - True to generate from high down to low (boolean)
+        Returns:
+            yields
+            element - the next element in the range (?)
+        -------------------------------------------------------
+        """
+        for node in self._irange_nodes(low, high, reverse):
+            yield node._data
+
+    def _irange_nodes(self, low, high, reverse):
+        """
+        -------------------------------------------------------
+        Generates the nodes whose keys lie in [low, high] in 
+        inorder or reverse inorder. Private operation called by 
+        irange and _merge.
+        Use: for node in self._irange_nodes(low, high, reverse):
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound key, None for no lower bound (?)
+            high - upper bound key, None for no upper bound (?)
+            reverse - True to generate from high down to low (boolean)
+        Returns:
+            yields
+            node - the next node in the range (BSTNode)
+        -------------------------------------------------------
+        """
+        stack = []
+        node = self._root
+        if not reverse:
+            while node is not None or stack:
+                if node is not None:
+                    if low is not None and node._key < low:
+                        # node and its left subtree are below the range
+                        node = node._right
+                    else:
+                        stack.append(node)
+                        node = node._left
+                else:
+                    node = stack.pop()
+                    if high is not None and high < node._key:
+                        break
+                    yield node
+                    node = node._right
+        else:
+            while node is not None or stack:
+                if node is not None:
+                    if high is not None and high < node._key:
+                        # node and its right subtree are above the range
+                        node = node._left
+                    else:
+                        stack.append(node)
+                        node = node._right
+                else:
+                    node = stack.pop()
+                    if low is not None and node._key < low:
+                        break
+                    yield node
+                    node = node._left
+
     def preorder(self):
         """
         -------------------------------------------------------
@@ -319,7 +1501,7 @@ class BST:
         ---------------------------------------------------------
         Traverses the subtree rooted at node in preorder. 
         a contains the contents of subtree rooted at node in preorder.
-        Private recursive operation called only by preorder.
+        Private iterative operation called only by preorder.
         Use: self._preorder_aux(node, a)
         ---------------------------------------------------------
         Parameters:
@@ -329,10 +1511,8 @@ class BST:
             None
         ---------------------------------------------------------
         """
-        if node is not None:
+        for node in self._nodes(node):
             a.append(node._data)
-            self._preorder_aux(node._left, a)
-            self._preorder_aux(node._right, a)
         return
 
     def postorder(self):
@@ -354,7 +1534,7 @@ class BST:
         ---------------------------------------------------------
         Traverses subtree rooted at node in postorder. 
         a contains the contents of subtree rooted at node in postorder.
-        Private recursive operation called only by postorder.
+        Private iterative operation called only by postorder.
         Use: self._postorder_aux(node, a)
         ---------------------------------------------------------
         Parameters:
@@ -364,34 +1544,99 @@ class BST:
             None
         ---------------------------------------------------------
         """
-        if node is not None:
-            self._postorder_aux(node._left, a)
-            self._postorder_aux(node._right, a)
+        # A root-right-left preorder, reversed, is a postorder.
+        start = len(a)
+        stack = [] if node is None else [node]
+        while stack:
+            node = stack.pop()
             a.append(node._data)
+            if node._left is not None:
+                stack.append(node._left)
+            if node._right is not None:
+                stack.append(node._right)
+        a[start:] = a[start:][::-1]
         return
 
-    def levelorder(self):
+    def _nodes(self, node):
+        """
+        ---------------------------------------------------------
+        Generates the nodes of the subtree rooted at node in 
+        preorder, using an explicit stack instead of recursion.
+        Private operation used by the traversal helpers.
+        Use: for n in self._nodes(node):
+        ---------------------------------------------------------
+        Parameters:
+            node - a BST node, may be None (BSTNode)
+        Returns:
+            yields
+            node - the next node of the subtree in preorder (BSTNode)
+        ---------------------------------------------------------
+        """
+        stack = [] if node is None else [node]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node._right is not None:
+                stack.append(node._right)
+            if node._left is not None:
+                stack.append(node._left)
+
+    def ilevelorder(self, max_depth=None):
+        """
+        -------------------------------------------------------
+        Generates the contents of the tree in levelorder order,
+        one level at a time. Nodes wait in a deque, so every node
+        is queued and dequeued in O(1) and the values are produced
+        lazily. With max_depth, only the top max_depth levels are
+        visited and nodes below them are never queued.
+        Use: for v in bst.ilevelorder():
+        Use: for v in bst.ilevelorder(max_depth):
+        -------------------------------------------------------
+        Parameters:
+            max_depth - number of levels to visit, the root being
+                level 1; None visits every level (int >= 0)
+        Returns:
+            yields
+            value - the next value in levelorder (?)
+        -------------------------------------------------------
+        """
+        assert max_depth is None or max_depth >= 0, \
+            "max_depth must be >= 0"
+
+        queue = deque()
+        if self._root is not None and max_depth != 0:
+            queue.append(self._root)
+        depth = 1
+        while queue:
+            # children are queued only while another level is wanted
+            deeper = max_depth is None or depth < max_depth
+            for _ in range(len(queue)):
+                node = queue.popleft()
+                yield node._data
+                if deeper:
+                    if node._left is not None:
+                        queue.append(node._left)
+                    if node._right is not None:
+                        queue.append(node._right)
+            depth += 1
+
+    def levelorder(self, max_depth=None):
         """
         -------------------------------------------------------
         Returns a Python list containing the contents of the tree
         in levelorder order.
         Use: values = bst.levelorder()
+        Use: values = bst.levelorder(max_depth)
         -------------------------------------------------------
+        Parameters:
+            max_depth - number of levels to include, the root being
+                level 1; None includes every level (int >= 0)
         Returns:
             values - a list containing the contents of bst in levelorder.
             (Python list of ?)
         -------------------------------------------------------
         """
-        values = []
-        q = Queue()
-        q.enqueue(self._root)
-        while not q.isEmpty():
-            node = q.dequeue()
-            if node is not None:
-                values.append(node._data)
-                q.enqueue(node._left)
-                q.enqueue(node._right)
-        return values
+        return list(self.ilevelorder(max_depth))
     
     def retrieve(self, key):
         """
@@ -400,24 +1645,28 @@ class BST:
         Use: v = bst.retrieve(key)
         -------------------------------------------------------
         Parameters:
-            key - data to search for (?)
+            key - data to search for (?)
+        Returns:
+            value - value in the node containing key, otherwise None (?)
+        -------------------------------------------------------
+        """
+        return self.retrieve_key(self._key_of(key))
+
+    def retrieve_key(self, key):
+        """
+        -------------------------------------------------------
+        Retrieves a copy of the element with the given key, where
+        key is a bare key rather than an element. (Iterative)
+        Use: v = bst.retrieve_key(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key to search for (?)
         Returns:
-            value - value in the node containing key, otherwise None (?)
+            value - a copy of the element with key, otherwise None (?)
         -------------------------------------------------------
         """
-        node = self._root
-        value = None
-
-        while node is not None and value is None:
-
-            if node._data > key:
-                node = node._left
-            elif node._data < key:
-                node = node._right
-            elif node._data == key:
-                # for comparison counting
-                value = deepcopy(node._data)
-        return value
+        node = self.find_key(key)
+        return None if node is None else deepcopy(node._data)
 
 
     def is_balanced(self):
@@ -425,6 +1674,8 @@ class BST:
         ---------------------------------------------------------
         Returns whether the bst is balanced, i.e. for each node in
         the bst the difference between its left and right subtrees is <= 1.
+        O(1) in AVL mode, otherwise every node is checked against
+        the cached heights of its children.
         Use: b = bst.is_balanced()
         ---------------------------------------------------------
         Returns:
@@ -432,7 +1683,7 @@ class BST:
         ---------------------------------------------------------
         """
         is_balanced = True
-        if self._root is not None:
+        if self._root is not None and not self._balanced:
             is_balanced = self._is_balanced_aux(self._root)
         return is_balanced
 
@@ -449,13 +1700,12 @@ class BST:
             is_balanced - True if node is balanced, False otherwise (boolean)
         ---------------------------------------------------------
         """
-        if self._count == 0:
-            balanced = True
-        else:
-            balanced, _ = self._is_balanced_aux(self._root)
+        balanced = True
+        for node in self._nodes(node):
+            if abs(self._balance(node)) > 1:
+                balanced = False
+                break
         return balanced  
-    
-    
 
 
     def is_identical(self, other):
@@ -472,7 +1722,7 @@ class BST:
         -------------------------------------------------------
         """
         identical = False
-        if self._count == other._count:
+        if len(self) == len(other):
             identical = self._is_identical_aux(self._root, other._root)
         return identical
 
@@ -492,12 +1742,17 @@ class BST:
                 in the same order, otherwise returns False (boolean)
         -------------------------------------------------------
         """
-        identical = False
-        if node1 is None and node2 is None:
-            identical = True
-        elif node1 is not None and node2 is not None:
-            if node1._data == node2._data:
-                identical = self._is_identical_aux(node1._left, node2._left) and self._is_identical_aux(node1._right, node2._right)
+        identical = True
+        stack = [(node1, node2)]
+        while identical and stack:
+            node1, node2 = stack.pop()
+            if node1 is None or node2 is None:
+                identical = node1 is None and node2 is None
+            elif node1._data != node2._data:
+                identical = False
+            else:
+                stack.append((node1._right, node2._right))
+                stack.append((node1._left, node2._left))
         return identical
 
     def is_valid(self):
@@ -522,6 +1777,8 @@ class BST:
         """
         ---------------------------------------------------------
         Determines if the subtree rooted at node is a valid BST.
+        Every node is checked against the bounds inherited from
+        all of its ancestors, not only against its parent.
         Use: b = self._is_valid_aux(self._root)
         ---------------------------------------------------------
         Parameters:
@@ -530,16 +1787,20 @@ class BST:
             valid - True if node is root of a valid BST, False otherwise (boolean)
         ---------------------------------------------------------
         """
-        if node is None:
-            valid = True 
-        elif node._left is not None and node._left._data > node._data:
-            valid = False
-        elif node._right is not None and node._right._data < node._data:
-            valid = False             
-        else:
-            valid = self._is_valid_aux(node._left)
-            if valid:
-                valid = self._is_valid_aux(node._right)
+        valid = True
+        # each entry holds a node and the exclusive (low, high) bounds
+        # on its data, None meaning unbounded
+        stack = [] if node is None else [(node, None, None)]
+        while valid and stack:
+            node, low, high = stack.pop()
+            if (low is not None and not low < node._key) or \
+                    (high is not None and not node._key < high):
+                valid = False
+            else:
+                if node._right is not None:
+                    stack.append((node._right, node._key, high))
+                if node._left is not None:
+                    stack.append((node._left, low, node._key))
         return valid
     
     def min(self):
@@ -562,110 +1823,42 @@ class BST:
         """
         ---------------------------------------------------------
         Returns the number of leaves (nodes with no children) in bst.
+        Derived from the maintained aggregates. (O(1))
         Use: n = bst.leaf_count()
-        (Recursive algorithm)
         ---------------------------------------------------------
         Returns:
             count - number of nodes with no children in bst (int)
         ---------------------------------------------------------
         """
-        count = 0
-        if self._root is not None:
-            count = self._leaf_count_aux(self._root)
-        return count
-
-    def _leaf_count_aux(self, node):
-        """
-        ---------------------------------------------------------
-        Returns the number of leaves (nodes with no children) in 
-        subtree rooted at node. Private helper method.
-        Use: count = self._leaf_count_aux(self._root)
-        ---------------------------------------------------------
-        Parameters:
-            node - a BST node (BSTNode)
-        Returns:
-            count - number of nodes with no children is subtree 
-                rooted at node (int)
-        ---------------------------------------------------------
-        """
-        count = 0
-        if node is not None:
-            if node._left is None and node._right is None:
-                count = 1
-            else:
-                count = self._leaf_count_aux(node._left) + self._leaf_count_aux(node._right)
+        count, _, _ = self.node_counts()
         return count
 
     def one_child_count(self):
         """
         ---------------------------------------------------------
         Returns the number of nodes with one child in the BST.
+        Derived from the maintained aggregates. (O(1))
         Use: count = bst.one_child_count()
         -------------------------------------------------------
         Returns:
             count - number of nodes with one child in bst (int)
         ----------------------------------------------------------
         """
-        count = 0
-        if self._root is not None:
-            count = self._one_child_count_aux(self._root)
-        return count
-
-    def _one_child_count_aux(self, node):
-        """
-        ---------------------------------------------------------
-        Returns the number of nodes with one child in subree rooted
-        at node.
-        -------------------------------------------------------
-        Parameters:
-            node - a BST node (BSTNode)
-        Returns:
-            count - number of nodes with one child in subtree rooted 
-                at node (int)
-        ----------------------------------------------------------
-        """
-
-        count = 0
-        if node is not None:
-            if (node._left is not None and node._right is None) or (node._left is None and node._right is not None):
-                count = 1
-            count += self._one_child_count_aux(node._left) + self._one_child_count_aux(node._right)
+        _, count, _ = self.node_counts()
         return count
 
     def two_child_count(self):
         """
         ---------------------------------------------------------
         Returns the number of nodes with two children in a BST.
+        Derived from the maintained aggregates. (O(1))
         Use: count = bst.two_child_count()
         -------------------------------------------------------
         Returns:
             count - number of nodes with two children in bst (int)
         ----------------------------------------------------------
         """
-        count = 0
-        if self._root is not None:
-            count = self._two_child_count_aux(self._root)
-        return count
-
-    def _two_child_count_aux(self, node):
-        """
-        ---------------------------------------------------------
-        Returns the number of nodes with two children in the subtree
-        rooted at node. Private helper method.
-        -------------------------------------------------------
-        Parameters:
-            node - a BST node (BSTNode)
-        Returns:
-            count - number of nodes with two children in subtree 
-                rooted at node (int)
-        ----------------------------------------------------------
-        """
-
-        count = 0
-        if node is not None:
-            if node._left is not None and node._right is not None:
-                count = 1
-            count += self._two_child_count_aux(node._left) + self._two_child_count_aux(node._right)
+        _, _, count = self.node_counts()
         return count
     
     def remove_root(self):
@@ -680,7 +1873,7 @@ class BST:
         """
         assert self._root is not None, "Cannot remove root from an empty BST"
         element = deepcopy(self._root._data)
-        self._root = self._remove_root_aux(self._root)
+        self._delete(self._root._key)
         return element
     
     def __contains__(self, element):
@@ -695,28 +1888,23 @@ class BST:
             True if the bst contains key, False otherwise (boolean)
         -------------------------------------------------------
         """
-        node = self._root
-        while node is not None and node._data != element:
-            if element < node._data:
-                node = node._left
-            else:
-                node = node._right
-        return node is not None
+        if self._keyfunc is not None:
+            element = self._keyfunc(element)
+        return self.find_key(element) is not None
 
     def height(self):
         """
         -------------------------------------------------------
         Returns the height of a BST, i.e. the length of the
         longest path from root to a leaf node in the tree.
+        Reads the height cached in the root node. (O(1))
         Use: h = bst.height()
         -------------------------------------------------------
         Returns:
             h - height of bst (int)
         -------------------------------------------------------
         """
-        h = 0
-        if self._root is not None:
-            h = self._height_aux(self._root)
+        h = self._node_height(self._root)
         return h
 
     def parent(self, key):
@@ -734,7 +1922,7 @@ class BST:
         """
         element = None
         if self._root is not None:
-            element = self._parent_aux(self._root, key)
+            element = self._parent_aux(self._root, self._key_of(key), None)
         return deepcopy(element)
 
     def parent_r(self, element):
@@ -753,7 +1941,7 @@ class BST:
         """
         data = None
         if self._root is not None:
-            data = self._parent_r_aux(self._root, element)
+            data = self._parent_r_aux(self._root, self._key_of(element))
         return deepcopy(data)
     
     
@@ -775,9 +1963,9 @@ class BST:
             previous = None
         else:
             cont = False
-            if node._data > key:
+            if key < node._key:
                 previous = self._parent_r_aux(node._left, key)
-            elif node._data < key:
+            elif node._key < key:
                 previous = self._parent_r_aux(node._right, key)
             else:
                 previous = "prev"
@@ -788,30 +1976,32 @@ class BST:
         return previous
 
 
-    def _parent_aux(self, node, element, parent):
+    def _parent_aux(self, node, key, parent):
         """
         ---------------------------------------------------------
         Returns the _data in the parent of the node containing the
-        given element in a bst rooted at node.
-        Private recursive operation called only by parent_r.
+        given key in a bst rooted at node.
+        Private iterative operation called only by parent.
         Use: e = self._parent_aux(node, key, parent of node)
         ---------------------------------------------------------
         Parameters:
-            node - a BST node
-            element - a  data element
-            parent - the parent of the node
+            node - a BST node (BSTNode)
+            key - the key of a data element (?)
+            parent - the _data of the parent of node, None at the root (?)
         Returns:
             data - the _data of the parent node, None if it has no parent (?)
         ---------------------------------------------------------
         """
-        if node is None:
-            data = None
-        elif node._data == element:
-            data = parent
-        elif element < node._data:
-            data = self._parent_aux(node._left, element, node._data)
-        else:
-            data = self._parent_aux(node._right, element, node._data)
+        data = None
+        while node is not None:
+            if not (key < node._key or node._key < key):
+                data = parent
+                break
+            parent = node._data
+            if key < node._key:
+                node = node._left
+            else:
+                node = node._right
         return data
 
     def max(self):
@@ -907,6 +2097,9 @@ class BST:
         ---------------------------------------------------------
         Returns the number of the three types of nodes in a BST:
         leaf nodes, node with one child, and nodes with two children.
+        Only the two-child count is maintained: a non-empty binary
+        tree always has one more leaf than it has two-child nodes,
+        and the one-child nodes are the rest. (O(1))
         Use: zero, one, two = bst.node_counts()
         -------------------------------------------------------
         Returns:
@@ -915,16 +2108,82 @@ class BST:
             two -  number of nodes with two children (int)
         ----------------------------------------------------------
         """
+        if self._stale:
+            self._recount()
 
-        zero = 0
-        one = 0
-        two = 0
-
-        if self._root is not None:
-            zero, one, two = self._node_counts_aux(self._root)
+        n = self._node_size(self._root)
+        two = self._twos
+        zero = two + 1 if n > 0 else 0
+        one = n - zero - two
 
         return zero, one, two
 
+    def _recount(self):
+        """
+        ---------------------------------------------------------
+        Recomputes the tree-wide aggregates with one walk of the
+        tree. Used after operations that rebuild or relink whole
+        subtrees at once (from_sorted, split, join).
+        Use: self._recount()
+        ---------------------------------------------------------
+        Returns:
+            None
+        ---------------------------------------------------------
+        """
+        twos = 0
+        total = 0
+        for node in self._nodes(self._root):
+            if node._left is not None and node._right is not None:
+                twos += 1
+            total += node._height
+        self._twos = twos
+        self._height_total = total
+        self._stale = False
+        return
+
+    def is_consistent(self):
+        """
+        ---------------------------------------------------------
+        Recomputes every cached value from scratch - the height and
+        size of each node and the tree-wide aggregates - and
+        compares them with the maintained ones. Also checks that
+        the tree is a valid BST and, in AVL mode, balanced.
+        FOR TESTING: O(n).
+        Use: b = bst.is_consistent()
+        ---------------------------------------------------------
+        Returns:
+            consistent - True if all cached values are correct (boolean)
+        ---------------------------------------------------------
+        """
+        consistent = self.is_valid()
+        twos = 0
+        total = 0
+        # each entry is a node and whether its children are done
+        stack = [] if self._root is None else [(self._root, False)]
+        while consistent and stack:
+            node, done = stack.pop()
+            if not done:
+                stack.append((node, True))
+                if node._right is not None:
+                    stack.append((node._right, False))
+                if node._left is not None:
+                    stack.append((node._left, False))
+            else:
+                left_height = self._node_height(node._left)
+                right_height = self._node_height(node._right)
+                height = max(left_height, right_height) + 1
+                size = self._node_size(node._left) + self._node_size(node._right) + 1
+                if node._height != height or node._size != size:
+                    consistent = False
+                elif self._balanced and abs(left_height - right_height) > 1:
+                    consistent = False
+                if node._left is not None and node._right is not None:
+                    twos += 1
+                total += height
+        if consistent and not self._stale:
+            consistent = twos == self._twos and total == self._height_total
+        return consistent
+
     def _node_counts_aux(self, node):
         """
         ---------------------------------------------------------
@@ -943,20 +2202,13 @@ class BST:
         one = 0
         two = 0
 
-        if node is not None:
+        for node in self._nodes(node):
             if node._left is None and node._right is None:
-                zero = 1
+                zero += 1
             elif node._left is None or node._right is None:
-                one = 1
+                one += 1
             else:
-                two = 1
-
-            zero_l, one_l, two_l = self._node_counts_aux(node._left)
-            zero_r, one_r, two_r = self._node_counts_aux(node._right)
-
-            zero += zero_l + zero_r
-            one += one_l + one_r
-            two += two_l + two_r
+                two += 1
 
         return zero, one, two
 
@@ -975,9 +2227,13 @@ class BST:
             tree - a mirror version of BST
         ---------------------------------------------------------
         """
-        tree = BST()
+        tree = BST(key=self._keyfunc)
         if self._root is not None:
             tree._root = self._mirror_aux(self._root)
+            # mirroring keeps every node's height and number of children
+            tree._twos = self._twos
+            tree._height_total = self._height_total
+            tree._stale = self._stale
         return tree
 
     def _mirror_aux(self, node):
@@ -986,7 +2242,8 @@ class BST:
         Creates a mirror version of a subtree rooted at node. All
         nodes are swapped with nodes on the other side the tree. 
         Nodes may take the place of an empty spot. The resulting 
-        tree is a mirror image of the original tree. 
+        tree is a mirror image of the original tree, built from new
+        nodes: the subtree rooted at node is unchanged. (Iterative)
         Use: self._mirror_aux(node)
         ---------------------------------------------------------
         Parameters:
@@ -995,9 +2252,21 @@ class BST:
             tree - a mirror version of subtree rooted at node.
         ---------------------------------------------------------
         """
+        tree = None
         if node is not None:
-            node._left, node._right = self._mirror_aux(node._right), self._mirror_aux(node._left)
-        return node
+            tree = self._clone(node)
+            stack = [(node, tree)]
+            while stack:
+                source, target = stack.pop()
+                target._height = source._height
+                target._size = source._size
+                if source._left is not None:
+                    target._right = self._clone(source._left)
+                    stack.append((source._left, target._right))
+                if source._right is not None:
+                    target._left = self._clone(source._right)
+                    stack.append((source._right, target._left))
+        return tree
 
 
     def _node_height(self, node):
@@ -1021,6 +2290,251 @@ class BST:
             height = node._height
         return height
 
+    def _node_size(self, node):
+        """
+        ---------------------------------------------------------
+        Helper function to determine the number of nodes in the
+        subtree rooted at node - handles empty node.
+        Private operation called only by other methods.
+        Use: n = self._node_size(node)
+        ---------------------------------------------------------
+        Parameters:
+            node - the root of the subtree (BSTNode)
+        Returns:
+            size - the number of nodes in the subtree rooted at node,
+             0 if node is None (int)
+        ---------------------------------------------------------
+        """
+        if node is None:
+            size = 0
+        else:
+            size = node._size
+        return size
+
+    def rank(self, key):
+        """
+        ---------------------------------------------------------
+        Returns the number of elements in the BST whose keys are 
+        smaller than key, i.e. the index key has (or would have) in
+        inorder. (O(height))
+        Use: r = bst.rank(key)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+        Returns:
+            r - number of elements with smaller keys (int)
+        ---------------------------------------------------------
+        """
+        return self._rank(key, False)
+
+    def _rank(self, key, inclusive):
+        """
+        ---------------------------------------------------------
+        Counts the elements smaller than key, or smaller than or
+        equal to key if inclusive is True, in one descent.
+        Private operation called by rank and count_range.
+        Use: r = self._rank(key, inclusive)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+            inclusive - True to also count an element with key (boolean)
+        Returns:
+            r - number of elements before key (int)
+        ---------------------------------------------------------
+        """
+        r = 0
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                node = node._left
+            elif node._key < key:
+                r += self._node_size(node._left) + 1
+                node = node._right
+            else:
+                r += self._node_size(node._left)
+                if inclusive:
+                    r += 1
+                break
+        return r
+
+    def select(self, k):
+        """
+        ---------------------------------------------------------
+        Returns the k-th smallest element in the BST, counting from
+        0, so bst.select(0) is the minimum and bst.select(len(bst) - 1)
+        the maximum. (O(height))
+        Use: element = bst.select(k)
+        ---------------------------------------------------------
+        Parameters:
+            k - index of the element in inorder (0 <= int < len(bst))
+        Returns:
+            element - a copy of the k-th smallest element (?)
+        ---------------------------------------------------------
+        """
+        assert 0 <= k < self._node_size(self._root), "Invalid rank"
+
+        node = self._root
+        while True:
+            left_size = self._node_size(node._left)
+            if k < left_size:
+                node = node._left
+            elif k > left_size:
+                k -= left_size + 1
+                node = node._right
+            else:
+                break
+        return deepcopy(node._data)
+
+    def count_range(self, low, high):
+        """
+        ---------------------------------------------------------
+        Returns the number of elements e in the BST with 
+        low <= e <= high, comparing keys if the BST has a key
+        function. (O(height))
+        Use: n = bst.count_range(low, high)
+        ---------------------------------------------------------
+        Parameters:
+            low - lower bound key of the range (?)
+            high - upper bound key of the range (?)
+        Returns:
+            n - number of elements in the range (int)
+        ---------------------------------------------------------
+        """
+        n = 0
+        if not high < low:
+            n = self._rank(high, True) - self._rank(low, False)
+        return n
+
+    def floor(self, key):
+        """
+        ---------------------------------------------------------
+        Returns the largest element in the BST that is smaller than
+        or equal to key. The element is not copied. (O(height))
+        Use: element = bst.floor(key)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+        Returns:
+            element - the largest element <= key, None if there is
+                no such element (?)
+        ---------------------------------------------------------
+        """
+        return self._bound(key, True, True)
+
+    def ceiling(self, key):
+        """
+        ---------------------------------------------------------
+        Returns the smallest element in the BST that is greater than
+        or equal to key. The element is not copied. (O(height))
+        Use: element = bst.ceiling(key)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+        Returns:
+            element - the smallest element >= key, None if there is
+                no such element (?)
+        ---------------------------------------------------------
+        """
+        return self._bound(key, False, True)
+
+    def predecessor(self, key):
+        """
+        ---------------------------------------------------------
+        Returns the largest element in the BST that is smaller than
+        key. key need not be in the BST. The element is not
+        copied. (O(height))
+        Use: element = bst.predecessor(key)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+        Returns:
+            element - the largest element < key, None if there is
+                no such element (?)
+        ---------------------------------------------------------
+        """
+        return self._bound(key, True, False)
+
+    def successor(self, key):
+        """
+        ---------------------------------------------------------
+        Returns the smallest element in the BST that is greater than
+        key. key need not be in the BST. The element is not
+        copied. (O(height))
+        Use: element = bst.successor(key)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+        Returns:
+            element - the smallest element > key, None if there is
+                no such element (?)
+        ---------------------------------------------------------
+        """
+        return self._bound(key, False, False)
+
+    def _bound(self, key, below, inclusive):
+        """
+        ---------------------------------------------------------
+        Finds the element closest to key on one side of it in a
+        single descent. Every node passed on the wanted side of key
+        is the best candidate so far; the search then moves towards
+        key to look for a closer one.
+        Private operation called by floor, ceiling, predecessor and
+        successor.
+        Use: element = self._bound(key, below, inclusive)
+        ---------------------------------------------------------
+        Parameters:
+            key - a key to compare against (?)
+            below - True to look for elements smaller than key,
+                False for elements greater than key (boolean)
+            inclusive - True to accept an element equal to key (boolean)
+        Returns:
+            element - the closest element, None if there is none (?)
+        ---------------------------------------------------------
+        """
+        best = None
+        node = self._root
+        while node is not None:
+            node_key = node._key
+            if key < node_key:
+                if not below:
+                    best = node
+                node = node._left
+            elif node_key < key:
+                if below:
+                    best = node
+                node = node._right
+            elif inclusive:
+                best = node
+                break
+            elif below:
+                node = node._left
+            else:
+                node = node._right
+        return None if best is None else best._data
+
+    def memory_report(self):
+        """
+        ---------------------------------------------------------
+        Measures the memory used by the nodes of the BST, not 
+        counting the data elements they refer to. 
+        Use: count, total, per_node = bst.memory_report()
+        ---------------------------------------------------------
+        Returns:
+            count - number of nodes in bst (int)
+            total - bytes used by all the nodes (int)
+            per_node - average bytes per node, 0 if bst is empty (float)
+        ---------------------------------------------------------
+        """
+        count = 0
+        total = 0
+        for node in self._nodes(self._root):
+            count += 1
+            total += getsizeof(node)
+            if hasattr(node, "__dict__"):
+                total += getsizeof(node.__dict__)
+        per_node = total / count if count else 0
+        return count, total, per_node
+
     def find_r(self, element):
         """
         -------------------------------------------------------
@@ -1038,28 +2552,28 @@ class BST:
         node = None
 
         if self._root is not None:
-            node = self._find_r_aux(self._root, element)
+            node = self._find_r_aux(self._root, self._key_of(element))
 
         return node
 
-    def _find_r_aux(self, current, element):
+    def _find_r_aux(self, current, key):
         """
         -------------------------------------------------------
-        find the given element in a BST rooted at current
+        find the element with the given key in a BST rooted at current
         -------------------------------------------------------
         Parameters:
             current - a bst node (_BST_Node)
-            element - data element to search for (?)
+            key - key of the data element to search for (?)
         Returns:
-            node - contains element, else returns None (?)
+            node - contains the element, else returns None (?)
         -------------------------------------------------------
         """
         if current is None:
             node = None
-        elif element < current._data:
-            node = self._find_r_aux(current._left, element)
-        elif element > current._data:
-            node = self._find_r_aux(current._right, element)
+        elif key < current._key:
+            node = self._find_r_aux(current._left, key)
+        elif current._key < key:
+            node = self._find_r_aux(current._right, key)
         else:
             node = current
 
@@ -1068,17 +2582,22 @@ class BST:
     def average_height(self):
         """
         ---------------------------------------------------------
-        Returns the average height of a bst.
+        Returns the average height of a bst, i.e. the mean of the
+        heights of the subtrees rooted at each node. Read from the
+        maintained sum of node heights. (O(1))
         ---------------------------------------------------------
         Returns:
             avg_height - total height count divided by the number of nodes
-                in the tree (int)
+                in the tree (float)
         ---------------------------------------------------------
         """
+        if self._stale:
+            self._recount()
 
         avg_height = 0
-        if self._root is not None:
-            avg_height = self._average_height_aux(self._root)
+        n = self._node_size(self._root)
+        if n > 0:
+            avg_height = self._height_total / n
 
         return avg_height
 
@@ -1095,13 +2614,13 @@ class BST:
         """
 
         a = []
-        stack = Stack()
+        stack = []
         node = self._root
 
-        while node is not None or not stack.is_empty():
+        while node is not None or stack:
             if node is not None:
                 a.append(deepcopy(node._data))
-                stack.push(node)
+                stack.append(node)
                 node = node._left
             else:
                 node = stack.pop()
@@ -1113,78 +2632,134 @@ class BST:
     def count(self):
         """
         ---------------------------------------------------------
-        Returns the number of nodes in a BST.
+        Returns the number of nodes in a BST. Reads the subtree
+        size cached in the root. (O(1))
         Use: number = bst.count()
         -------------------------------------------------------
         Returns:
             number - count of nodes in bst (int)
         ----------------------------------------------------------
         """
-        number = 0
-
-        if self._root is not None:
-            number = self._count_aux(self._root)
+        number = self._node_size(self._root)
 
         return number
 
-    def _count_aux(self, node):
+    def count_apply(self, func, executor=None, chunks=None):
         """
         ---------------------------------------------------------
-        Returns the number of nodes in a subtree rooted at node
+        Returns the number of data elements in a BST where 
+        func(element) is True. Given a concurrent.futures executor,
+        the elements are cut into chunks pieces of equal size whose
+        counts are computed by the executor's workers and added up.
+        A ProcessPoolExecutor needs a func that can be pickled (a
+        module-level function) and elements that can be pickled.
+        Use: number = bst.count_apply(func)
+        Use: number = bst.count_apply(func, executor)
         -------------------------------------------------------
         Parameters:
-            node - a BST node (BSTNode)
+            func - a function that given a data element in the bst
+                returns True for some condition, otherwise returns False.
+            executor - a thread or process pool to run func on, None
+                to run serially (concurrent.futures.Executor)
+            chunks - number of pieces to split the tree into, 
+                defaults to 4 per CPU (int > 0)
         Returns:
-            number - count of nodes in the subtree rooted at node (int)
+            number - count of nodes in tree where func(element) is True (int)
         ----------------------------------------------------------
         """
         number = 0
 
-        if node is not None:
-            number = 1 + self._count_aux(node._left) + self._count_aux(node._right)
+        if executor is None:
+            if self._root is not None:
+                number = self._count_apply_aux(self._root, func)
+        else:
+            futures = [executor.submit(_count_true, func, values)
+                       for values in self._chunks(chunks)]
+            for future in futures:
+                number += future.result()
 
         return number
 
-    def count_apply(self, func):
+    def apply(self, func, executor=None, chunks=None):
         """
         ---------------------------------------------------------
-        Returns the number of data elements in a BST where 
-        func(element) is True.
-        Use: number = bst.count_apply(func)
+        Returns the results of func applied to every data element,
+        in inorder. Given a concurrent.futures executor, the tree is
+        split as in count_apply and the pieces are mapped by the
+        executor's workers.
+        Use: results = bst.apply(func)
+        Use: results = bst.apply(func, executor)
         -------------------------------------------------------
         Parameters:
-            func - a function that given a data element in the bst
-                returns True for some condition, otherwise returns False.
+            func - a function of one data element (function)
+            executor - a thread or process pool to run func on, None
+                to run serially (concurrent.futures.Executor)
+            chunks - number of pieces to split the tree into, 
+                defaults to 4 per CPU (int > 0)
         Returns:
-            number - count of nodes in tree where func(element) is True (int)
+            results - func(element) for each element in inorder (list of ?)
         ----------------------------------------------------------
         """
-        number = 0
+        if executor is None:
+            results = _map_values(func, (node._data for node in
+                                         self._irange_nodes(None, None, False)))
+        else:
+            futures = [executor.submit(_map_values, func, values)
+                       for values in self._chunks(chunks)]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        return results
 
-        if self._root is not None:
-            number = self._count_apply_aux(self._root, func)
+    def _chunks(self, chunks):
+        """
+        ---------------------------------------------------------
+        Splits the elements of the tree into disjoint pieces for
+        parallel work and returns them, piece by piece, in inorder.
+        The pieces are equal index ranges of the inorder sequence,
+        so their sizes differ by at most one and no piece is empty.
+        Use: for values in self._chunks(chunks):
+        ---------------------------------------------------------
+        Parameters:
+            chunks - the number of pieces wanted, None for 4 per 
+                CPU (int > 0)
+        Returns:
+            pieces - the elements of each piece, at most chunks
+                pieces (list of list of ?)
+        ---------------------------------------------------------
+        """
+        if chunks is None:
+            chunks = 4 * (cpu_count() or 1)
+        assert chunks > 0, "chunks must be > 0"
 
-        return number
+        values = []
+        self._inorder_aux(self._root, values)
+        n = len(values)
+        chunks = min(chunks, n)
+        pieces = [values[i * n // chunks:(i + 1) * n // chunks]
+                  for i in range(chunks)]
+        return pieces
 
-    def _count_apply_aux(self, func, node):
+    def _count_apply_aux(self, node, func):
         """
         ---------------------------------------------------------
         Returns the number of nodes in a subtree rooted at node
         where the result of calling func(value) is True.
-        Use: number = self.__count_apply_aux(func, node)
+        Use: number = self._count_apply_aux(node, func)
         -------------------------------------------------------
         Parameters:
             node - a BST node (BSTNode)
+            func - a function that given a data element returns
+                True or False
         Returns:
             number - count of nodes in the subtree rooted at node (int)
         ----------------------------------------------------------
         """
         number = 0
 
-        if node is not None:
+        for node in self._nodes(node):
             if func(node._data):
-                number = 1
-            number += self._count_apply_aux(func, node._left) + self._count_apply_aux(func, node._right)
+                number += 1
 
         return number
 
@@ -1201,17 +2776,4 @@ class BST:
             value - the values in the BST node and its children (?)
         -------------------------------------------------------
         """
-        if self._root is not None:
-            # Put the nodes for one level into a queue.
-            queue = []
-            queue.append(self._root)
-
-            while len(queue) > 0:
-                # Add a copy of the data to the sublist
-                node = queue.pop(0)
-                yield node._data
-
-                if node._left is not None:
-                    queue.append(node._left)
-                if node._right is not None:
-                    queue.append(node._right)
+        yield from self.ilevelorder()
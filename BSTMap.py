@@ -0,0 +1,375 @@
+"""
+-------------------------------------------------------
+Ordered map version of the BST ADT.
+Every node holds a key and the value stored under it. The keys
+are ordered, balanced and searched by the BST machinery, so
+get, put, setdefault and pop each cost one O(log n) descent.
+Values are stored as given (not copied) and are updated in
+place, without deleting and inserting the node.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from BST import _NO_KEY, BST, BSTNode
+
+
+class BSTMapNode(BSTNode):
+    __slots__ = ("_value",)
+
+    def __init__(self, data, key=_NO_KEY):
+        """
+        -------------------------------------------------------
+        Initializes a map node containing the key data and no
+        value yet. Child pointers are None.
+        Use: node = BSTMapNode(key)
+        -------------------------------------------------------
+        Parameters:
+            data - the map key for the node (?)
+            key - the cached ordering key of data, omitted if data
+                is its own ordering key (?)
+        Returns:
+            A BSTMapNode object (BSTMapNode)
+        -------------------------------------------------------
+        """
+        BSTNode.__init__(self, data, key)
+        self._value = None
+
+    def _take(self, other):
+        """
+        -------------------------------------------------------
+        Replaces the key and the value of the node with those of
+        other.
+        Use: node._take(other)
+        -------------------------------------------------------
+        Parameters:
+            other - the node to take the contents of (BSTMapNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        BSTNode._take(self, other)
+        self._value = other._value
+        return
+
+    def _swap(self, other):
+        """
+        -------------------------------------------------------
+        Exchanges the key and the value of the node with those of
+        other.
+        Use: node._swap(other)
+        -------------------------------------------------------
+        Parameters:
+            other - the node to exchange contents with (BSTMapNode)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        BSTNode._swap(self, other)
+        self._value, other._value = other._value, self._value
+        return
+
+    def __str__(self):
+        """
+        USE FOR TESTING ONLY
+        -------------------------------------------------------
+        Returns node key and value as a string - for debugging.
+        -------------------------------------------------------
+        """
+        return "{} {}: {} {}".format("{", self._data, self._value, "}")
+
+
+class BSTMap(BST):
+    _node_class = BSTMapNode
+
+    def __init__(self, balanced=True, key=None):
+        """
+        -------------------------------------------------------
+        Initializes an empty map. By default the map is kept
+        height balanced (AVL), so every operation is O(log n).
+        The BST methods that take elements (insert, find,
+        retrieve, delete, in) take map keys; the queries that take
+        bounds (irange, rank, floor, ...) take ordering keys,
+        which are the map keys unless key is given.
+        Use: m = BSTMap()
+        -------------------------------------------------------
+        Parameters:
+            balanced - True to keep the map height balanced (boolean)
+            key - a function returning the value to order a map
+                key by, None to compare the map keys (function)
+        Returns:
+            A BSTMap object (BSTMap)
+        -------------------------------------------------------
+        """
+        BST.__init__(self, balanced=balanced, key=key)
+
+    @classmethod
+    def from_items(cls, pairs, balanced=None, key=None):
+        """
+        -------------------------------------------------------
+        Creates a perfectly balanced map from (key, value) pairs
+        already in increasing order of key (of key(map key) if the
+        key function is given). For a repeated key the last value
+        is kept, as in dict(pairs). Runs in O(n), as from_sorted.
+        (from_sorted and from_iterable take bare keys and store
+        None under each.)
+        Use: m = BSTMap.from_items(pairs)
+        -------------------------------------------------------
+        Parameters:
+            pairs - (key, value) pairs in increasing order of key
+                (iterable of tuple)
+            balanced - True to keep the map height balanced, None
+                for the default (AVL) (boolean)
+            key - a function returning the value to order a map
+                key by, None to compare the map keys (function)
+        Returns:
+            m - a balanced map of pairs (BSTMap)
+        -------------------------------------------------------
+        """
+        keys = []
+        values = []
+        previous = None
+        for map_key, value in pairs:
+            order = map_key if key is None else key(map_key)
+            if keys and not previous < order:
+                assert not order < previous, "Keys must be in sorted order"
+                # repeated key: the last value wins
+                values[-1] = value
+                continue
+            keys.append(map_key)
+            values.append(value)
+            previous = order
+        m = cls.from_sorted(keys, balanced=balanced, key=key)
+        for node, value in zip(m._irange_nodes(None, None, False), values):
+            node._value = value
+        return m
+
+    def dump(self, path):
+        """
+        -------------------------------------------------------
+        Not supported: the dump format stores bare elements, so
+        the values of a map would be lost.
+        Use: m.dump(path)
+        -------------------------------------------------------
+        Parameters:
+            path - name of the file to write (str)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        assert False, "A BSTMap cannot be dumped: dump writes no values"
+
+    def get(self, key, default=None):
+        """
+        -------------------------------------------------------
+        Returns the value stored under key. The value itself is
+        returned, not a copy.
+        Use: value = m.get(key)
+        Use: value = m.get(key, default)
+        -------------------------------------------------------
+        Parameters:
+            key - the key to look up (?)
+            default - value to return if key is not in the map (?)
+        Returns:
+            value - the value stored under key, default if key is
+                not in the map (?)
+        -------------------------------------------------------
+        """
+        node = self.find(key)
+        return default if node is None else node._value
+
+    def put(self, key, value):
+        """
+        -------------------------------------------------------
+        Stores value under key. If key is already in the map its
+        node is kept and only the value is replaced.
+        Use: m.put(key, value)
+        -------------------------------------------------------
+        Parameters:
+            key - the key to store value under (?)
+            value - the value to store (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        node, _ = self._add(key, self._key_of(key))
+        node._value = value
+        return
+
+    def setdefault(self, key, default=None):
+        """
+        -------------------------------------------------------
+        Returns the value stored under key, first storing default
+        under key if key is not in the map.
+        Use: value = m.setdefault(key, default)
+        -------------------------------------------------------
+        Parameters:
+            key - the key to look up (?)
+            default - value to store if key is not in the map (?)
+        Returns:
+            value - the value stored under key (?)
+        -------------------------------------------------------
+        """
+        node, added = self._add(key, self._key_of(key))
+        if added:
+            node._value = default
+        return node._value
+
+    def update_value(self, key, func, default=None):
+        """
+        -------------------------------------------------------
+        Replaces the value stored under key with func(value) in a
+        single descent, starting from default if key is not in the
+        map. For example, m.update_value(word, lambda n: n + 1, 0)
+        counts words.
+        Use: value = m.update_value(key, func, default)
+        -------------------------------------------------------
+        Parameters:
+            key - the key whose value is updated (?)
+            func - a function of the old value returning the new
+                value (function)
+            default - the old value to use if key is not in the map (?)
+        Returns:
+            value - the new value stored under key (?)
+        -------------------------------------------------------
+        """
+        node, added = self._add(key, self._key_of(key))
+        node._value = func(default if added else node._value)
+        return node._value
+
+    def pop(self, key, default=None):
+        """
+        -------------------------------------------------------
+        Removes key from the map and returns the value that was
+        stored under it, in one descent.
+        Use: value = m.pop(key)
+        Use: value = m.pop(key, default)
+        -------------------------------------------------------
+        Parameters:
+            key - the key to remove (?)
+            default - value to return if key is not in the map (?)
+        Returns:
+            value - the value stored under key, default if key was
+                not in the map (?)
+        -------------------------------------------------------
+        """
+        node = self._delete(self._key_of(key))
+        return default if node is None else node._value
+
+    def __getitem__(self, key):
+        """
+        -------------------------------------------------------
+        Returns the value stored under key. Raises KeyError if
+        key is not in the map, as a dict does.
+        Use: value = m[key]
+        -------------------------------------------------------
+        Parameters:
+            key - a key in the map (?)
+        Returns:
+            value - the value stored under key (?)
+        -------------------------------------------------------
+        """
+        node = self.find(key)
+        if node is None:
+            raise KeyError(key)
+        return node._value
+
+    def __setitem__(self, key, value):
+        """
+        -------------------------------------------------------
+        Stores value under key, as put does.
+        Use: m[key] = value
+        -------------------------------------------------------
+        Parameters:
+            key - the key to store value under (?)
+            value - the value to store (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        self.put(key, value)
+        return
+
+    def items(self, low=None, high=None, reverse=False):
+        """
+        -------------------------------------------------------
+        Generates the (key, value) pairs of the map in key order,
+        optionally only those whose ordering keys lie in
+        [low, high]. A scan of k pairs costs O(log n + k).
+        Use: for key, value in m.items():
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound, None for no lower bound (?)
+            high - upper bound, None for no upper bound (?)
+            reverse - True to generate from high down to low (boolean)
+        Returns:
+            yields
+            item - the next key and its value (tuple)
+        -------------------------------------------------------
+        """
+        for node in self._irange_nodes(low, high, reverse):
+            yield node._data, node._value
+
+    def keys(self, low=None, high=None, reverse=False):
+        """
+        -------------------------------------------------------
+        Generates the keys of the map in order, as irange does.
+        Use: for key in m.keys():
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound, None for no lower bound (?)
+            high - upper bound, None for no upper bound (?)
+            reverse - True to generate from high down to low (boolean)
+        Returns:
+            yields
+            key - the next key (?)
+        -------------------------------------------------------
+        """
+        return self.irange(low, high, reverse)
+
+    def values(self, low=None, high=None, reverse=False):
+        """
+        -------------------------------------------------------
+        Generates the values of the map in the order of their keys.
+        Use: for value in m.values():
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound, None for no lower bound (?)
+            high - upper bound, None for no upper bound (?)
+            reverse - True to generate from high down to low (boolean)
+        Returns:
+            yields
+            value - the value of the next key (?)
+        -------------------------------------------------------
+        """
+        for node in self._irange_nodes(low, high, reverse):
+            yield node._value
+
+    def _clone(self, node):
+        """
+        -------------------------------------------------------
+        Returns a new unlinked node with a copy of the key of node
+        and the same value.
+        Use: copy = self._clone(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a map node (BSTMapNode)
+        Returns:
+            copy - a new node with the same key and value (BSTMapNode)
+        -------------------------------------------------------
+        """
+        copy = BST._clone(self, node)
+        copy._value = node._value
+        return copy
+
+    def __iter__(self):
+        """
+        -------------------------------------------------------
+        Generates a Python iterator over the keys of the map in
+        key order.
+        Use: for key in m:
+        -------------------------------------------------------
+        Returns:
+            yields
+            key - the next key (?)
+        -------------------------------------------------------
+        """
+        return self.irange()
@@ -0,0 +1,421 @@
+"""
+-------------------------------------------------------
+Array version of the BST ADT.
+Nodes are slots in parallel arrays: _data holds the elements,
+_left and _right hold the slot numbers of the children (-1 for
+no child). Deleted slots are chained into a free list through
+_left and reused by later inserts.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from array import array
+from collections import deque
+from copy import deepcopy
+
+# slot number used for a missing child / empty tree / end of free list
+NIL = -1
+
+
+class BST:
+
+    def __init__(self):
+        """
+        -------------------------------------------------------
+        Initializes an empty BST.
+        Use: bst = BST()
+        -------------------------------------------------------
+        Returns:
+            A BST object (BST)
+        -------------------------------------------------------
+        """
+        self._data = []
+        self._left = array('q')
+        self._right = array('q')
+        self._root = NIL
+        self._free = NIL
+        self._count = 0
+
+    @classmethod
+    def from_sorted(cls, values):
+        """
+        -------------------------------------------------------
+        Creates a perfectly balanced BST from values that are
+        already in increasing order. Repeated values are stored
+        once. Slot i holds the i-th smallest element, so the arrays
+        are filled in one pass and linked in O(n).
+        Use: bst = BST.from_sorted(values)
+        -------------------------------------------------------
+        Parameters:
+            values - data elements in increasing order (iterable of ?)
+        Returns:
+            bst - a balanced BST containing values (BST)
+        -------------------------------------------------------
+        """
+        bst = cls()
+        data = bst._data
+        for value in values:
+            if data:
+                assert not value < data[-1], "Values must be in sorted order"
+                if not data[-1] < value:
+                    # repeated value
+                    continue
+            data.append(deepcopy(value))
+        n = len(data)
+        bst._left = array('q', [NIL]) * n
+        bst._right = array('q', [NIL]) * n
+        bst._count = n
+
+        if n > 0:
+            bst._root = (n - 1) // 2
+            # each entry is a subtree root and the slot range it covers
+            stack = [(bst._root, 0, n)]
+            while stack:
+                middle, low, high = stack.pop()
+                if low < middle:
+                    child = (low + middle - 1) // 2
+                    bst._left[middle] = child
+                    stack.append((child, low, middle))
+                if middle + 1 < high:
+                    child = (middle + 1 + high - 1) // 2
+                    bst._right[middle] = child
+                    stack.append((child, middle + 1, high))
+        return bst
+
+    def isEmpty(self):
+        """
+        -------------------------------------------------------
+        Determines if BST is empty.
+        Use: b = bst.isEmpty()
+        -------------------------------------------------------
+        Returns:
+            True if bst is empty, False otherwise.
+        -------------------------------------------------------
+        """
+        return self._root == NIL
+
+    def __len__(self):
+        """
+        -------------------------------------------------------
+        Returns the number of elements in the BST.
+        Use: n = len(bst)
+        -------------------------------------------------------
+        Returns:
+            the number of elements in bst.
+        -------------------------------------------------------
+        """
+        return self._count
+
+    def _allocate(self, element):
+        """
+        -------------------------------------------------------
+        Stores element in a free slot with no children, reusing
+        the first slot of the free list when there is one.
+        Use: slot = self._allocate(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data to store (?)
+        Returns:
+            slot - the slot holding element (int)
+        -------------------------------------------------------
+        """
+        if self._free != NIL:
+            slot = self._free
+            self._free = self._left[slot]
+            self._data[slot] = element
+            self._left[slot] = NIL
+        else:
+            slot = len(self._data)
+            self._data.append(element)
+            self._left.append(NIL)
+            self._right.append(NIL)
+        return slot
+
+    def _release(self, slot):
+        """
+        -------------------------------------------------------
+        Adds slot to the front of the free list.
+        Use: self._release(slot)
+        -------------------------------------------------------
+        Parameters:
+            slot - a slot no longer in the tree (int)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        self._data[slot] = None
+        self._left[slot] = self._free
+        self._right[slot] = NIL
+        self._free = slot
+        return
+
+    def insert(self, element):
+        """
+        -------------------------------------------------------
+        Inserts a copy of data element into BST. The data element
+        may appear only once in the tree. (Iterative)
+        Use: bst.insert(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data to be inserted into bst (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        data = self._data
+        left = self._left
+        right = self._right
+        parent = NIL
+        slot = self._root
+        while slot != NIL:
+            parent = slot
+            if element < data[slot]:
+                slot = left[slot]
+            elif element > data[slot]:
+                slot = right[slot]
+            else:
+                print("The element is already in the tree")
+                return None
+
+        slot = self._allocate(deepcopy(element))
+        if parent == NIL:
+            self._root = slot
+        elif element < data[parent]:
+            left[parent] = slot
+        else:
+            right[parent] = slot
+        self._count += 1
+        return None
+
+    def find(self, element):
+        """
+        -------------------------------------------------------
+        Returns the element in the BST equal to the given element.
+        Returns None if the BST does not contain this element, so
+        test the result with "is not None". (Iterative)
+        Use: value = bst.find(element)
+        -------------------------------------------------------
+        Parameters:
+            element - element to search for (?)
+        Returns:
+            value - the element stored in the BST, None if the
+            element is not found (?)
+        -------------------------------------------------------
+        """
+        slot = self._find_slot(element)
+        return None if slot == NIL else self._data[slot]
+
+    def _find_slot(self, element):
+        """
+        -------------------------------------------------------
+        Returns the slot in the BST containing the given element.
+        Private operation called by find, retrieve and in.
+        Use: slot = self._find_slot(element)
+        -------------------------------------------------------
+        Parameters:
+            element - element to search for (?)
+        Returns:
+            slot - The slot containing the given element, NIL if
+            the element is not found (int)
+        -------------------------------------------------------
+        """
+        data = self._data
+        slot = self._root
+        while slot != NIL:
+            if element < data[slot]:
+                slot = self._left[slot]
+            elif element > data[slot]:
+                slot = self._right[slot]
+            else:
+                break
+        return slot
+
+    def retrieve(self, key):
+        """
+        -------------------------------------------------------
+        Retrieves a copy of a value matching key in a BST. (Iterative)
+        Use: v = bst.retrieve(key)
+        -------------------------------------------------------
+        Parameters:
+            key - data to search for (?)
+        Returns:
+            value - value in the slot containing key, otherwise None (?)
+        -------------------------------------------------------
+        """
+        slot = self._find_slot(key)
+        value = None
+        if slot != NIL:
+            value = deepcopy(self._data[slot])
+        return value
+
+    def __contains__(self, element):
+        """
+        ---------------------------------------------------------
+        Determines if bst contains the given element.
+        Use: b = element in bst
+        -------------------------------------------------------
+        Parameters:
+            element - a comparable data element (?)
+        Returns:
+            True if the bst contains element, False otherwise (boolean)
+        -------------------------------------------------------
+        """
+        return self._find_slot(element) != NIL
+
+    def delete(self, element):
+        """
+        -------------------------------------------------------
+        deletes the slot containing the given element from BST.
+        A slot with two children takes the data of its inorder
+        successor, whose slot is freed instead. (Iterative)
+        Use: bst.delete(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data element to be deleted (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        data = self._data
+        left = self._left
+        right = self._right
+        parent = NIL
+        slot = self._root
+        while slot != NIL:
+            if element < data[slot]:
+                parent = slot
+                slot = left[slot]
+            elif element > data[slot]:
+                parent = slot
+                slot = right[slot]
+            else:
+                break
+        if slot == NIL:
+            # element is not in the BST
+            return
+
+        if left[slot] != NIL and right[slot] != NIL:
+            # two children: move the smallest element of the right
+            # subtree into slot and unlink that element's slot instead
+            parent = slot
+            successor = right[slot]
+            while left[successor] != NIL:
+                parent = successor
+                successor = left[successor]
+            data[slot] = data[successor]
+            slot = successor
+
+        child = left[slot] if right[slot] == NIL else right[slot]
+        if parent == NIL:
+            self._root = child
+        elif left[parent] == slot:
+            left[parent] = child
+        else:
+            right[parent] = child
+        self._release(slot)
+        self._count -= 1
+        return
+
+    def inorder(self):
+        """
+        -------------------------------------------------------
+        Returns a Python list containing the contents of the tree
+        in inorder order. (Iterative)
+        Use: a = bst.inorder()
+        -------------------------------------------------------
+        Returns:
+            a - copy of the contents of the tree in inorder (Python list of ?)
+        -------------------------------------------------------
+        """
+        a = []
+        data = self._data
+        left = self._left
+        right = self._right
+        stack = []
+        slot = self._root
+        while slot != NIL or stack:
+            if slot != NIL:
+                stack.append(slot)
+                slot = left[slot]
+            else:
+                slot = stack.pop()
+                a.append(data[slot])
+                slot = right[slot]
+        return a
+
+    def min(self):
+        """
+        -------------------------------------------------------
+        Finds the minimum element in BST. (Iterative algorithm)
+        Use: element = bst.min()
+        -------------------------------------------------------
+        Returns:
+            element - a copy of the minimum element in the BST (?)
+        -------------------------------------------------------
+        """
+        assert self._root != NIL, "Cannot find minimum of an empty BST"
+        slot = self._root
+        while self._left[slot] != NIL:
+            slot = self._left[slot]
+        return deepcopy(self._data[slot])
+
+    def max(self):
+        """
+        -------------------------------------------------------
+        Finds the maximum element in BST. (Iterative algorithm)
+        Use: element = bst.max()
+        -------------------------------------------------------
+        Returns:
+            element - a copy of the maximum element in the BST (?)
+        -------------------------------------------------------
+        """
+        assert self._root != NIL, "Cannot find maximum of an empty BST"
+        slot = self._root
+        while self._right[slot] != NIL:
+            slot = self._right[slot]
+        return deepcopy(self._data[slot])
+
+    def snapshot(self):
+        """
+        -------------------------------------------------------
+        Returns an independent copy of the BST. The child arrays
+        are copied as whole buffers and the element list with one
+        slice, so no per-node objects are created.
+        Use: copy = bst.snapshot()
+        -------------------------------------------------------
+        Returns:
+            copy - a tree of the same class with the same shape and
+                elements (BST)
+        -------------------------------------------------------
+        """
+        copy = type(self)()
+        copy._data = self._data[:]
+        copy._left = array('q', self._left)
+        copy._right = array('q', self._right)
+        copy._root = self._root
+        copy._free = self._free
+        copy._count = self._count
+        return copy
+
+    def __iter__(self):
+        """
+        -------------------------------------------------------
+        Generates a Python iterator. Iterates through the BST
+        in level order, as the linked BST does.
+        Use: for v in bst:
+        -------------------------------------------------------
+        Returns:
+            yields
+            value - the next element in the BST (?)
+        -------------------------------------------------------
+        """
+        data = self._data
+        queue = deque()
+        if self._root != NIL:
+            queue.append(self._root)
+        while queue:
+            slot = queue.popleft()
+            yield data[slot]
+            if self._left[slot] != NIL:
+                queue.append(self._left[slot])
+            if self._right[slot] != NIL:
+                queue.append(self._right[slot])
@@ -0,0 +1,724 @@
+"""
+-------------------------------------------------------
+Benchmarks for the BST ADT.
+Use: python BST_benchmark.py
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from random import Random
+from sys import getsizeof
+from threading import Event, Lock, Thread
+from time import perf_counter
+import tracemalloc
+
+from BST import BST
+from BST_concurrent import ConcurrentBST
+from BST_instrument import instrument, uninstrument
+from BST_parent import ParentBST
+from BSTMap import BSTMap
+from BTree import BTree
+from IntervalTree import IntervalTree
+from Treap import Treap
+
+
+def _rate(n, seconds):
+    """
+    -------------------------------------------------------
+    Formats an operation count and elapsed time as a rate.
+    Use: s = _rate(n, seconds)
+    -------------------------------------------------------
+    Parameters:
+        n - number of operations performed (int)
+        seconds - elapsed time in seconds (float)
+    Returns:
+        s - a human readable throughput (str)
+    -------------------------------------------------------
+    """
+    return "{:>10.3f} s {:>12,.0f} ops/s".format(seconds, n / seconds if seconds else 0)
+
+
+def bench_sequential(n=1000000, balanced=True):
+    """
+    -------------------------------------------------------
+    Inserts the keys 0..n-1 in increasing order, then finds
+    them, looks up their parents, traverses and deletes them,
+    printing the throughput of each phase. Sequential keys
+    are the worst case for a plain BST (the tree degenerates
+    into a list), so keep n small when balanced is False.
+    Use: bench_sequential(n, balanced)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+        balanced - True to run the BST in AVL mode (boolean)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("sequential keys: n={:,} balanced={}".format(n, balanced))
+    bst = BST(balanced=balanced)
+
+    start = perf_counter()
+    for key in range(n):
+        bst.insert(key)
+    print("  insert   ", _rate(n, perf_counter() - start))
+    print("  height    {:>10}".format(bst.height()))
+
+    start = perf_counter()
+    for key in range(n):
+        bst.find(key)
+    print("  find     ", _rate(n, perf_counter() - start))
+
+    start = perf_counter()
+    for key in range(n):
+        parent = bst.parent(key)
+        assert (parent is None) == (key == bst._root._data), "parent is wrong"
+    print("  parent   ", _rate(n, perf_counter() - start))
+
+    start = perf_counter()
+    values = bst.inorder()
+    print("  inorder  ", _rate(len(values), perf_counter() - start))
+
+    start = perf_counter()
+    for key in range(n):
+        bst.delete(key)
+    print("  delete   ", _rate(n, perf_counter() - start))
+    return
+
+
+class _DictNode:
+    """
+    -------------------------------------------------------
+    A node with the same attributes as BSTNode but without
+    __slots__, so each one carries a __dict__: the layout the
+    nodes had before __slots__, measured by bench_memory.
+    -------------------------------------------------------
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._key = data
+        self._left = None
+        self._right = None
+        self._height = 1
+        self._size = 1
+
+
+def bench_memory(n=1000000):
+    """
+    -------------------------------------------------------
+    Builds a BST of n integer keys and prints the bytes per node
+    reported by memory_report, along with the bytes per element
+    actually allocated while building the tree (keys included).
+    The same is measured for n nodes with a __dict__ instead of
+    __slots__, and both are printed side by side.
+    Use: bench_memory(n)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("memory: n={:,}".format(n))
+    tracemalloc.start()
+    bst = BST.from_sorted(range(n))
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count, total, per_node = bst.memory_report()
+    del bst
+
+    tracemalloc.start()
+    nodes = [_DictNode(key) for key in range(n)]
+    dict_allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    dict_total = sum(getsizeof(node) + getsizeof(node.__dict__) for node in nodes)
+    del nodes
+
+    print("  nodes      {:>12,}".format(count))
+    print("  {:<10} {:>12} {:>12}".format("per node", "__slots__", "__dict__"))
+    print("  {:<10} {:>12.1f} {:>12.1f}".format("node bytes", per_node, dict_total / n))
+    print("  {:<10} {:>12.1f} {:>12.1f}".format("allocated", allocated / n, dict_allocated / n))
+    return
+
+
+def _time_workload(tree, keys, probes):
+    """
+    -------------------------------------------------------
+    Inserts keys into tree and then looks up every probe,
+    returning the time taken by each phase.
+    Use: insert_time, find_time = _time_workload(tree, keys, probes)
+    -------------------------------------------------------
+    Parameters:
+        tree - an empty BST or BTree (?)
+        keys - keys to insert (list of ?)
+        probes - keys to look up (list of ?)
+    Returns:
+        insert_time - seconds spent inserting (float)
+        find_time - seconds spent looking up (float)
+    -------------------------------------------------------
+    """
+    start = perf_counter()
+    for key in keys:
+        tree.insert(key)
+    insert_time = perf_counter() - start
+
+    start = perf_counter()
+    for key in probes:
+        tree.find(key)
+    find_time = perf_counter() - start
+    return insert_time, find_time
+
+
+def bench_btree(n=200000, seed=1):
+    """
+    -------------------------------------------------------
+    Compares BTree with BST on random and on sorted keys,
+    printing insert and find throughput. The plain BST is only
+    run on random keys: on sorted keys it is O(n^2).
+    Use: bench_btree(n)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+        seed - seed for the random workload (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    rng = Random(seed)
+    random_keys = rng.sample(range(n * 10), n)
+    sorted_keys = list(range(n))
+    workloads = (("random", random_keys), ("sorted", sorted_keys))
+
+    print("btree vs bst: n={:,}".format(n))
+    for name, keys in workloads:
+        probes = keys[:]
+        rng.shuffle(probes)
+        trees = [("BTree(32)", BTree()), ("BTree(64)", BTree(64)),
+                 ("BST avl", BST(balanced=True))]
+        if name == "random":
+            trees.append(("BST", BST()))
+        for label, tree in trees:
+            insert_time, find_time = _time_workload(tree, keys, probes)
+            print("  {:<7} {:<10} insert {}  find {}".format(
+                name, label, _rate(n, insert_time), _rate(n, find_time)))
+    return
+
+
+def bench_find_many(n=200000, batches=(100, 10000, 200000), seed=1):
+    """
+    -------------------------------------------------------
+    Compares BST.find_many with one find per key, for batches
+    of random probes of increasing size against a tree of n keys.
+    Use: bench_find_many(n, batches)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys in the tree (int > 0)
+        batches - probe batch sizes to time (tuple of int)
+        seed - seed for the random workload (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    rng = Random(seed)
+    bst = BST.from_iterable(rng.sample(range(n * 5), n))
+    print("find_many: n={:,}".format(n))
+    for k in batches:
+        probes = [rng.randrange(n * 5) for _ in range(k)]
+
+        start = perf_counter()
+        bst.find_many(probes)
+        batched = perf_counter() - start
+
+        start = perf_counter()
+        for key in probes:
+            bst.find(key)
+        single = perf_counter() - start
+        print("  batch {:>8,}  find_many {}  find {}".format(
+            k, _rate(k, batched), _rate(k, single)))
+    return
+
+
+def _zipf_trace(keys, length, s, rng):
+    """
+    -------------------------------------------------------
+    Returns a trace of lookups where the i-th most popular key
+    is drawn with probability proportional to 1 / i**s. Key
+    popularity is unrelated to key order.
+    Use: trace = _zipf_trace(keys, length, s, rng)
+    -------------------------------------------------------
+    Parameters:
+        keys - the keys to draw from (list of ?)
+        length - number of lookups (int > 0)
+        s - Zipf exponent, larger is more skewed (float > 0)
+        rng - random number generator (Random)
+    Returns:
+        trace - keys to look up (list of ?)
+    -------------------------------------------------------
+    """
+    popular = keys[:]
+    rng.shuffle(popular)
+    cumulative = []
+    total = 0
+    for rank in range(1, len(popular) + 1):
+        total += 1 / rank ** s
+        cumulative.append(total)
+    return rng.choices(popular, cum_weights=cumulative, k=length)
+
+
+def bench_splay(n=100000, lookups=500000, s=1.1, seed=1):
+    """
+    -------------------------------------------------------
+    Compares retrieve on a plain BST, an AVL BST and a splay-mode
+    BST holding the same n keys, on a Zipf-distributed trace. The
+    trace is run twice: once timed, and once measuring the mean
+    depth at which each key is found just before it is accessed.
+    Use: bench_splay(n, lookups, s)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+        lookups - length of the lookup trace (int > 0)
+        s - Zipf exponent of the trace (float > 0)
+        seed - seed for the random workload (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    rng = Random(seed)
+    keys = rng.sample(range(n * 10), n)
+    trace = _zipf_trace(keys, lookups, s, rng)
+
+    print("zipf retrieve: n={:,} lookups={:,} s={}".format(n, lookups, s))
+    trees = (("BST", BST()), ("BST avl", BST(balanced=True)),
+             ("BST splay", BST(splay=True)))
+    for label, tree in trees:
+        for key in keys:
+            tree.insert(key)
+        start = perf_counter()
+        for key in trace:
+            tree.retrieve(key)
+        elapsed = perf_counter() - start
+
+        depth = 0
+        for key in trace:
+            node = tree._root
+            while node._data != key:
+                depth += 1
+                node = node._left if key < node._data else node._right
+            tree.retrieve(key)
+        print("  {:<10} {}  mean depth {:>6.2f}".format(
+            label, _rate(lookups, elapsed), depth / lookups))
+    return
+
+
+class _Record:
+    """
+    -------------------------------------------------------
+    A record ordered by a field, with a deliberately costly
+    comparison that stands in for a rich element type.
+    -------------------------------------------------------
+    """
+    __slots__ = ("stamp", "payload")
+
+    def __init__(self, stamp, payload):
+        self.stamp = stamp
+        self.payload = payload
+
+    def __lt__(self, other):
+        return (self.stamp, self.payload) < (other.stamp, other.payload)
+
+    def __gt__(self, other):
+        return (self.stamp, self.payload) > (other.stamp, other.payload)
+
+    def __eq__(self, other):
+        return (self.stamp, self.payload) == (other.stamp, other.payload)
+
+
+def bench_key(n=100000, seed=1):
+    """
+    -------------------------------------------------------
+    Inserts and finds n records in an AVL BST that compares the
+    records themselves, then in one ordered by a key function
+    (whose keys are cached in the nodes and probed with
+    find_key), printing the throughput of each.
+    Use: bench_key(n, seed)
+    -------------------------------------------------------
+    Parameters:
+        n - number of records (int > 0)
+        seed - random seed for the record order (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("records: n={:,}".format(n))
+    rng = Random(seed)
+    stamps = list(range(n))
+    rng.shuffle(stamps)
+    records = [_Record(stamp, "payload") for stamp in stamps]
+
+    bst = BST(balanced=True)
+    start = perf_counter()
+    for record in records:
+        bst.insert(record)
+    print("  insert   ", _rate(n, perf_counter() - start))
+    start = perf_counter()
+    for record in records:
+        bst.find(record)
+    print("  find     ", _rate(n, perf_counter() - start))
+
+    bst = BST(balanced=True, key=lambda record: record.stamp)
+    start = perf_counter()
+    for record in records:
+        bst.insert(record)
+    print("  insert(k)", _rate(n, perf_counter() - start))
+    start = perf_counter()
+    for stamp in stamps:
+        bst.find_key(stamp)
+    print("  find_key ", _rate(n, perf_counter() - start))
+    return
+
+
+def bench_map(n=10000, updates=200000, seed=1):
+    """
+    -------------------------------------------------------
+    Counts updates random keys drawn from n keys: once in an
+    AVL BST of [key, count] records, replacing a record with a
+    delete_key and an insert, and once with BSTMap.update_value,
+    printing the throughput of each.
+    Use: bench_map(n, updates, seed)
+    -------------------------------------------------------
+    Parameters:
+        n - number of distinct keys (int > 0)
+        updates - number of counter updates (int > 0)
+        seed - random seed for the update trace (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("counters: n={:,} updates={:,}".format(n, updates))
+    rng = Random(seed)
+    trace = [rng.randrange(n) for _ in range(updates)]
+
+    bst = BST(balanced=True, key=lambda record: record[0])
+    start = perf_counter()
+    for key in trace:
+        node = bst.find_key(key)
+        count = 0 if node is None else node._data[1]
+        bst.delete_key(key)
+        bst.insert([key, count + 1])
+    print("  BST      ", _rate(updates, perf_counter() - start))
+
+    counts = BSTMap()
+    start = perf_counter()
+    for key in trace:
+        counts.update_value(key, lambda count: count + 1, 0)
+    print("  BSTMap   ", _rate(updates, perf_counter() - start))
+    return
+
+
+def _run_threads(find, write, keys, readers, lookups, seed):
+    """
+    -------------------------------------------------------
+    Runs readers threads that each look up lookups random keys
+    with find, while one writer thread keeps calling write until
+    the readers are done.
+    Use: elapsed, writes, latencies = _run_threads(find, write, keys, readers, lookups, seed)
+    -------------------------------------------------------
+    Parameters:
+        find - a function of one key that searches the tree (function)
+        write - a function of one int that changes the tree (function)
+        keys - keys to look up (list of ?)
+        readers - number of reader threads (int > 0)
+        lookups - lookups per reader (int > 0)
+        seed - random seed for the lookups (int)
+    Returns:
+        elapsed - seconds until the last reader finished (float)
+        writes - number of writes made meanwhile (int)
+        latencies - seconds taken by each lookup (list of float)
+    -------------------------------------------------------
+    """
+    done = Event()
+    writes = [0]
+    latencies = []
+
+    def writer():
+        i = 0
+        while not done.is_set():
+            write(i)
+            i += 1
+        writes[0] = i
+
+    def reader(rng):
+        probes = [rng.choice(keys) for _ in range(lookups)]
+        times = []
+        for key in probes:
+            start = perf_counter()
+            find(key)
+            times.append(perf_counter() - start)
+        latencies.extend(times)
+
+    threads = [Thread(target=reader, args=(Random(seed + i),)) for i in range(readers)]
+    write_thread = Thread(target=writer)
+    write_thread.start()
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+    done.set()
+    write_thread.join()
+    return elapsed, writes[0], latencies
+
+
+def bench_concurrent(n=100000, readers=4, lookups=50000, seed=1):
+    """
+    -------------------------------------------------------
+    Runs reader threads against a tree that one writer thread
+    keeps inserting into and deleting from: first a BST behind
+    one global lock, then a ConcurrentBST, whose readers take no
+    lock. Prints the read and write throughput and the 99th
+    percentile lookup latency of each.
+    Use: bench_concurrent(n, readers, lookups, seed)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys in the tree (int > 0)
+        readers - number of reader threads (int > 0)
+        lookups - lookups per reader (int > 0)
+        seed - random seed for the lookups (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("threads: n={:,} readers={} lookups={:,}".format(n, readers, lookups))
+    keys = list(range(0, 2 * n, 2))
+
+    bst = BST.from_sorted(keys, balanced=True)
+    lock = Lock()
+
+    def locked_find(key):
+        with lock:
+            return bst.find(key)
+
+    def locked_write(i):
+        # odd keys are never looked up; insert one, then remove it
+        with lock:
+            bst.insert(2 * (i % n) + 1)
+        with lock:
+            bst.delete(2 * (i % n) + 1)
+
+    shared = ConcurrentBST()
+    shared.update(lambda tree: tree.from_sorted(keys))
+
+    def cow_write(i):
+        shared.insert(2 * (i % n) + 1)
+        shared.delete(2 * (i % n) + 1)
+
+    runs = (("global lock", locked_find, locked_write),
+            ("ConcurrentBST", shared.find, cow_write))
+    for label, find, write in runs:
+        elapsed, writes, latencies = _run_threads(find, write, keys, readers, lookups, seed)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print("  {:<13} reads {}  writes {:>9,.0f}/s  p99 {:>8.1f} us".format(
+            label, _rate(readers * lookups, elapsed), 2 * writes / elapsed, p99 * 1e6))
+    return
+
+
+def bench_instrument(n=2000, seed=1):
+    """
+    -------------------------------------------------------
+    Inserts n keys in increasing order into a plain BST and an
+    AVL BST, looks every key up with instrumentation on, and 
+    prints the mean find depth and comparisons of each next to
+    the depth of a perfectly balanced tree. Then times the same
+    lookups with the instrumentation removed and installed.
+    Use: bench_instrument(n, seed)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+        seed - random seed for the lookup order (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("instrumented finds: n={:,}".format(n))
+    probes = list(range(n))
+    Random(seed).shuffle(probes)
+    for label, balanced in (("BST", False), ("BST avl", True)):
+        bst = BST(balanced=balanced)
+        for key in range(n):
+            bst.insert(key)
+
+        start = perf_counter()
+        for key in probes:
+            bst.find(key)
+        plain = perf_counter() - start
+
+        stats = instrument(bst)
+        start = perf_counter()
+        for key in probes:
+            bst.find(key)
+        measured = perf_counter() - start
+        uninstrument(bst)
+
+        data = stats.export()
+        find = data["operations"]["find"]
+        print("  {:<8} depth {:>8.1f} (balanced {:>2})  comparisons {:>8.1f}".format(
+            label, find["mean_depth"], data["balanced_depth"], find["mean_comparisons"]))
+        print("  {:<8} off {}".format("", _rate(n, plain)))
+        print("  {:<8} on  {}".format("", _rate(n, measured)))
+    return
+
+
+def bench_pages(n=1000000, size=100):
+    """
+    -------------------------------------------------------
+    Pages through n keys size elements at a time: first with
+    irange, searching from the root for the start of each page,
+    then with ParentBST.page, which resumes from the node the
+    previous page stopped at.
+    Use: bench_pages(n, size)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+        size - elements per page (int > 0)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("pages: n={:,} size={}".format(n, size))
+    bst = BST.from_sorted(range(n), balanced=True)
+    start = perf_counter()
+    low = 0
+    while True:
+        values = []
+        for value in bst.irange(low):
+            if len(values) == size:
+                break
+            values.append(value)
+        if len(values) < size:
+            break
+        low = values[-1] + 1
+    print("  irange   ", _rate(n, perf_counter() - start))
+
+    bst = ParentBST.from_sorted(range(n), balanced=True)
+    start = perf_counter()
+    node = bst.findMin(bst._root)
+    while node is not None:
+        values, node = bst.page(node, size)
+    print("  page     ", _rate(n, perf_counter() - start))
+    return
+
+
+def bench_treap(n=200000, seed=1):
+    """
+    -------------------------------------------------------
+    Inserts n random keys into an AVL BST and into a Treap,
+    then finds them and deletes half of each tree - with one
+    delete per key, and for the treap with one delete_range -
+    printing the throughput of each phase.
+    Use: bench_treap(n, seed)
+    -------------------------------------------------------
+    Parameters:
+        n - number of keys (int > 0)
+        seed - random seed for the keys (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("treap: n={:,}".format(n))
+    keys = list(range(n))
+    Random(seed).shuffle(keys)
+    for label, tree in (("BST avl", BST(balanced=True)), ("Treap", Treap())):
+        insert_time, find_time = _time_workload(tree, keys, keys)
+        print("  {:<8} height {:>4}".format(label, tree.height()))
+        print("  {:<8} insert {}".format("", _rate(n, insert_time)))
+        print("  {:<8} find   {}".format("", _rate(n, find_time)))
+        start = perf_counter()
+        for key in range(n // 2):
+            tree.delete(key)
+        print("  {:<8} delete {}".format("", _rate(n // 2, perf_counter() - start)))
+
+    treap = Treap.from_sorted(range(n))
+    start = perf_counter()
+    treap.delete_range(0, n // 2 - 1)
+    print("  {:<8} delete_range {:>10.6f} s".format("Treap", perf_counter() - start))
+    return
+
+
+def bench_interval(n=200000, queries=1000, seed=1):
+    """
+    -------------------------------------------------------
+    Inserts n random time ranges into an IntervalTree, then
+    answers overlap queries both with overlapping and with a
+    linear scan of inorder(), printing the throughput of each
+    and checking that they agree. Also bulk-builds the tree and
+    appends intervals in order, checking it stays balanced.
+    Use: bench_interval(n, queries, seed)
+    -------------------------------------------------------
+    Parameters:
+        n - number of intervals (int > 0)
+        queries - number of overlap queries (int > 0)
+        seed - random seed for the intervals (int)
+    Returns:
+        None
+    -------------------------------------------------------
+    """
+    print("interval: n={:,}".format(n))
+    rng = Random(seed)
+    span = n * 10
+    intervals = []
+    for i in range(n):
+        start = rng.randrange(span)
+        intervals.append((start, start + rng.randrange(100), i))
+    probes = []
+    for _ in range(queries):
+        low = rng.randrange(span)
+        probes.append((low, low + rng.randrange(100)))
+
+    tree = IntervalTree()
+    start = perf_counter()
+    for interval in intervals:
+        tree.insert(interval)
+    print("  {:<8} insert {}".format("tree", _rate(n, perf_counter() - start)))
+
+    start = perf_counter()
+    found = [tree.overlapping(low, high) for low, high in probes]
+    print("  {:<8} query  {}".format("tree", _rate(queries, perf_counter() - start)))
+    print("  {:<8} mean results {:.1f}".format("", sum(map(len, found)) / queries))
+
+    # the linear scan is far slower; time a tenth of the queries
+    some = probes[:max(1, queries // 10)]
+    start = perf_counter()
+    scanned = [[e for e in tree.inorder() if e[0] <= high and e[1] >= low]
+               for low, high in some]
+    print("  {:<8} query  {}".format("scan", _rate(len(some), perf_counter() - start)))
+    assert scanned == found[:len(some)]
+
+    # a bulk-built tree is in AVL mode too, so appending intervals
+    # in order keeps it shallow
+    start = perf_counter()
+    bulk = IntervalTree.from_iterable(intervals)
+    print("  {:<8} build  {}".format("bulk", _rate(n, perf_counter() - start)))
+    for i in range(n // 10):
+        bulk.insert((span + i, span + i + 1, i))
+    print("  {:<8} height {:>4} after {:,} appends".format("", bulk.height(), n // 10))
+    assert bulk.height() < 2 * tree.height(), "bulk-built tree is not balanced"
+    return
+
+
+if __name__ == "__main__":
+    bench_sequential(1000000, balanced=True)
+    # O(n^2) without balancing - deep enough to overflow any recursion
+    bench_sequential(2000, balanced=False)
+    bench_memory(1000000)
+    bench_btree(200000)
+    bench_find_many(200000)
+    bench_splay(100000)
+    bench_key(100000)
+    bench_map(10000)
+    bench_concurrent(100000)
+    bench_instrument(2000)
+    bench_pages(1000000)
+    bench_treap(200000)
+    bench_interval(200000)
@@ -0,0 +1,282 @@
+"""
+-------------------------------------------------------
+Thread-safe version of the BST ADT, using copy-on-write root
+swapping. The tree is a PersistentBST: every insert or delete
+builds a new version that shares all unchanged nodes with the
+old one, and then publishes it by rebinding a single attribute.
+Writers take a lock so they do not lose each other's updates;
+readers take no lock at all. They read the current version
+once and search it, and a version never changes after it is
+published, so a reader never blocks on a writer and never sees
+a half-finished update.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from threading import Lock
+
+from BST_persistent import PersistentBST
+
+
+class ConcurrentBST:
+
+    def __init__(self, balanced=True, key=None):
+        """
+        -------------------------------------------------------
+        Initializes an empty concurrent BST.
+        Use: bst = ConcurrentBST()
+        -------------------------------------------------------
+        Parameters:
+            balanced - True to keep the tree height balanced (boolean)
+            key - a function returning the value to order an element
+                by, None to compare the elements (function)
+        Returns:
+            A ConcurrentBST object (ConcurrentBST)
+        -------------------------------------------------------
+        """
+        # the current version; rebinding it is a single atomic store
+        self._tree = PersistentBST(balanced=balanced, key=key)
+        self._write_lock = Lock()
+
+    def snapshot(self):
+        """
+        -------------------------------------------------------
+        Returns the current version of the tree. It never changes,
+        so any number of queries on it see one consistent state,
+        whatever writers do in the meantime. (O(1))
+        Use: tree = bst.snapshot()
+        -------------------------------------------------------
+        Returns:
+            tree - the current version (PersistentBST)
+        -------------------------------------------------------
+        """
+        return self._tree
+
+    def insert(self, element):
+        """
+        -------------------------------------------------------
+        Inserts a copy of data element into the BST. The data
+        element may appear only once in the tree. Readers keep
+        using the old version until the new one is published.
+        Use: bst.insert(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data to be inserted (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        with self._write_lock:
+            self._tree = self._tree.insert(element)
+        return
+
+    def delete(self, element):
+        """
+        -------------------------------------------------------
+        Deletes element from the BST.
+        Use: bst.delete(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data element to be deleted (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        with self._write_lock:
+            self._tree = self._tree.delete(element)
+        return
+
+    def delete_key(self, key):
+        """
+        -------------------------------------------------------
+        Deletes the element with the given key from the BST.
+        Use: bst.delete_key(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key of the element to be deleted (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        with self._write_lock:
+            self._tree = self._tree.delete_key(key)
+        return
+
+    def remove_root(self):
+        """
+        -------------------------------------------------------
+        Removes the root node and returns the data element in it.
+        Use: element = bst.remove_root()
+        -------------------------------------------------------
+        Returns:
+            element - the data element in root (?)
+        -------------------------------------------------------
+        """
+        with self._write_lock:
+            element, self._tree = self._tree.remove_root()
+        return element
+
+    def update(self, func):
+        """
+        -------------------------------------------------------
+        Applies several changes as one atomic update: func is given
+        the current version and returns the version to publish,
+        e.g. lambda tree: tree.insert(a).delete(b). Readers see
+        either none or all of the changes.
+        Use: bst.update(func)
+        -------------------------------------------------------
+        Parameters:
+            func - a function of a version returning a new version
+                (function)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        with self._write_lock:
+            self._tree = func(self._tree)
+        return
+
+    def find(self, element):
+        """
+        -------------------------------------------------------
+        Returns the node containing the given element, None if the
+        BST does not contain it. Does not lock.
+        Use: node = bst.find(element)
+        -------------------------------------------------------
+        Parameters:
+            element - element to search for (?)
+        Returns:
+            node - The node containing the given element, None if
+            the element is not found (BSTNode)
+        -------------------------------------------------------
+        """
+        return self._tree.find(element)
+
+    def find_key(self, key):
+        """
+        -------------------------------------------------------
+        Returns the node whose element has the given key, None if
+        there is none. Does not lock.
+        Use: node = bst.find_key(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key to search for (?)
+        Returns:
+            node - The node containing an element with key, None if
+            there is no such element (BSTNode)
+        -------------------------------------------------------
+        """
+        return self._tree.find_key(key)
+
+    def retrieve(self, key):
+        """
+        -------------------------------------------------------
+        Retrieves a copy of a value matching key. Does not lock.
+        Use: v = bst.retrieve(key)
+        -------------------------------------------------------
+        Parameters:
+            key - data to search for (?)
+        Returns:
+            value - value in the node containing key, otherwise None (?)
+        -------------------------------------------------------
+        """
+        return self._tree.retrieve(key)
+
+    def retrieve_key(self, key):
+        """
+        -------------------------------------------------------
+        Retrieves a copy of the element with the given key. Does
+        not lock.
+        Use: v = bst.retrieve_key(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key to search for (?)
+        Returns:
+            value - a copy of the element with key, otherwise None (?)
+        -------------------------------------------------------
+        """
+        return self._tree.retrieve_key(key)
+
+    def __contains__(self, element):
+        """
+        ---------------------------------------------------------
+        Determines if the BST contains the given element. Does not
+        lock.
+        Use: b = element in bst
+        -------------------------------------------------------
+        Parameters:
+            element - a comparable data element (?)
+        Returns:
+            True if the bst contains element, False otherwise (boolean)
+        -------------------------------------------------------
+        """
+        return element in self._tree
+
+    def __len__(self):
+        """
+        -------------------------------------------------------
+        Returns the number of elements in the BST.
+        Use: n = len(bst)
+        -------------------------------------------------------
+        Returns:
+            the number of elements in bst.
+        -------------------------------------------------------
+        """
+        return len(self._tree)
+
+    def isEmpty(self):
+        """
+        -------------------------------------------------------
+        Determines if the BST is empty.
+        Use: b = bst.isEmpty()
+        -------------------------------------------------------
+        Returns:
+            True if bst is empty, False otherwise.
+        -------------------------------------------------------
+        """
+        return self._tree.isEmpty()
+
+    def inorder(self):
+        """
+        -------------------------------------------------------
+        Returns a Python list containing the contents of the tree
+        in inorder order, all from one version.
+        Use: a = bst.inorder()
+        -------------------------------------------------------
+        Returns:
+            a - copy of the contents of the tree in inorder (Python list of ?)
+        -------------------------------------------------------
+        """
+        return self._tree.inorder()
+
+    def irange(self, low=None, high=None, reverse=False):
+        """
+        -------------------------------------------------------
+        Generates the elements e of the tree with low <= e <= high,
+        as BST.irange does. The whole scan reads the version that
+        was current when it started.
+        Use: for element in bst.irange(low, high):
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound key, None for no lower bound (?)
+            high - upper bound key, None for no upper bound (?)
+            reverse - True to generate from high down to low (boolean)
+        Returns:
+            yields
+            element - the next element in the range (?)
+        -------------------------------------------------------
+        """
+        return self._tree.irange(low, high, reverse)
+
+    def __iter__(self):
+        """
+        -------------------------------------------------------
+        Generates a Python iterator over one version of the tree,
+        in level order.
+        Use: for v in bst:
+        -------------------------------------------------------
+        Returns:
+            yields
+            value - the values in the BST (?)
+        -------------------------------------------------------
+        """
+        return iter(self._tree)
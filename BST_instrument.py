@@ -0,0 +1,552 @@
+"""
+-------------------------------------------------------
+Opt-in instrumentation for the BST ADT.
+instrument(bst) installs wrappers on one tree object that
+record, for every insert, find, find_key, retrieve,
+retrieve_key, delete, delete_key and traversal, the key
+comparisons made, the nodes visited and the depth reached.
+Searches are counted inside the tree's own walks: the
+wrappers hand the methods that take keys (find_key, _add,
+_delete and the bounds of irange) a probe in place of the key,
+which counts every comparison the walk makes against it. So
+every tree class - splay mode, Treap, BSTMap - is measured by
+its own code. The work a mutation does after its search
+(rotations, the walk to a successor) compares no keys and is
+not counted. A key type whose __lt__ does not hand foreign
+operands back (as the built-in types do) still works, but its
+own comparisons against the probe are not counted.
+The wrappers are instance attributes that shadow the class
+methods, so uninstrument(bst) removes them and the BST class
+itself is never changed: trees that are not instrumented run
+exactly the same code as before.
+Use: stats = instrument(bst)
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from functools import wraps
+import json
+from math import log2
+
+from BST_persistent import PersistentBST
+
+# public operations that take an element or a key; each call is
+# recorded as one operation, whatever it calls internally
+_SEARCHES = ("insert", "find", "retrieve", "retrieve_key", "delete", "delete_key")
+# the methods all searches go through, with the position of their
+# key argument and the operation a call made outside the searches
+# above (e.g. by BSTMap.put or remove_root) is recorded as
+_PROBED = {"find_key": (0, "find_key"), "_add": (1, "insert"), "_delete": (0, "delete")}
+# operations that return a list of the visited elements
+_TRAVERSALS = ("inorder", "preorder", "postorder", "levelorder", "preorder_i")
+# operations that generate the visited elements
+_GENERATORS = ("irange", "ilevelorder")
+
+
+class BSTStats:
+
+    def __init__(self, bst):
+        """
+        -------------------------------------------------------
+        Initializes empty statistics for the operations on bst.
+        Use: stats = BSTStats(bst)
+        -------------------------------------------------------
+        Parameters:
+            bst - the tree being measured (BST)
+        Returns:
+            A BSTStats object (BSTStats)
+        -------------------------------------------------------
+        """
+        self._bst = bst
+        # per operation name: [calls, comparisons, visits, max depth,
+        # {depth: calls}, {comparisons: calls}]
+        self._ops = {}
+        # the counts of the operation running, None between operations;
+        # the operations it calls internally add to it
+        self._counter = None
+
+    def record(self, op, comparisons, visits, depth):
+        """
+        -------------------------------------------------------
+        Adds one call of op to the statistics.
+        Use: stats.record(op, comparisons, visits, depth)
+        -------------------------------------------------------
+        Parameters:
+            op - name of the operation (str)
+            comparisons - key comparisons made (int)
+            visits - nodes visited (int)
+            depth - deepest level reached, the root being 1 (int)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        entry = self._ops.get(op)
+        if entry is None:
+            entry = [0, 0, 0, 0, {}, {}]
+            self._ops[op] = entry
+        entry[0] += 1
+        entry[1] += comparisons
+        entry[2] += visits
+        if depth > entry[3]:
+            entry[3] = depth
+        entry[4][depth] = entry[4].get(depth, 0) + 1
+        entry[5][comparisons] = entry[5].get(comparisons, 0) + 1
+        return
+
+    def reset(self):
+        """
+        -------------------------------------------------------
+        Discards everything recorded so far.
+        Use: stats.reset()
+        -------------------------------------------------------
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        self._ops = {}
+        return
+
+    def export(self):
+        """
+        -------------------------------------------------------
+        Returns the statistics as plain data: per operation the
+        number of calls, the total and mean comparisons and visits,
+        the largest depth and the depth and comparison histograms,
+        along with the current size of the tree and the depth of a
+        perfectly balanced tree of that size. A mean depth far above
+        the balanced depth shows that the tree has degenerated.
+        Use: data = stats.export()
+        -------------------------------------------------------
+        Returns:
+            data - the statistics (dict)
+        -------------------------------------------------------
+        """
+        n = len(self._bst)
+        data = {
+            "size": n,
+            "height": self._bst.height(),
+            "balanced_depth": int(log2(n)) + 1 if n > 0 else 0,
+            "operations": {},
+        }
+        for op, entry in sorted(self._ops.items()):
+            calls, comparisons, visits, max_depth, depths, compares = entry
+            mean_depth = sum(depth * count for depth, count in depths.items()) / calls
+            data["operations"][op] = {
+                "calls": calls,
+                "comparisons": comparisons,
+                "mean_comparisons": comparisons / calls,
+                "visits": visits,
+                "mean_visits": visits / calls,
+                "mean_depth": mean_depth,
+                "max_depth": max_depth,
+                "depth_histogram": dict(sorted(depths.items())),
+                "comparison_histogram": dict(sorted(compares.items())),
+            }
+        return data
+
+    def write_json(self, path):
+        """
+        -------------------------------------------------------
+        Writes the exported statistics to a JSON file, e.g. to
+        track lookup cost over time.
+        Use: stats.write_json(path)
+        -------------------------------------------------------
+        Parameters:
+            path - name of the file to write (str)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        with open(path, "w") as f:
+            json.dump(self.export(), f, indent=2)
+        return
+
+
+class _Counter:
+    """
+    -------------------------------------------------------
+    The counts of one recorded operation: the comparisons made
+    against its probes and, per probed search, the distinct
+    nodes compared.
+    -------------------------------------------------------
+    """
+    __slots__ = ("comparisons", "visits", "depth", "seen")
+
+    def __init__(self):
+        self.comparisons = 0
+        self.visits = 0
+        self.depth = 0
+        # the node keys compared, by identity: a node's key is its own
+        # object, so each distinct key is one distinct node
+        self.seen = {}
+
+
+class _Probe:
+    """
+    -------------------------------------------------------
+    Stands in for a search key: compares as the key does and
+    counts each comparison, and the node key compared against,
+    in a counter. key < probe reaches __gt__ when the node key's
+    own __lt__ hands the foreign operand back.
+    -------------------------------------------------------
+    """
+    __slots__ = ("_key", "_counter")
+
+    def __init__(self, key, counter):
+        self._key = key
+        self._counter = counter
+
+    def __lt__(self, other):
+        counter = self._counter
+        counter.comparisons += 1
+        counter.seen[id(other)] = other
+        return self._key < other
+
+    def __gt__(self, other):
+        counter = self._counter
+        counter.comparisons += 1
+        counter.seen[id(other)] = other
+        return other < self._key
+
+    def __getitem__(self, index):
+        # nodes that derive cached values from their key (e.g. the
+        # end point of an interval) may read it before _add restores it
+        return self._key[index]
+
+    def __getattr__(self, name):
+        return getattr(self._key, name)
+
+
+def _paths(bst, keys):
+    """
+    -------------------------------------------------------
+    Returns the number of distinct nodes on the paths from the
+    root to the nodes with the given keys, and the longest of
+    those paths. A walk that reached those nodes went through
+    all of them.
+    Use: visits, depth = _paths(bst, keys)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        keys - keys of nodes in bst (iterable of ?)
+    Returns:
+        visits - distinct nodes on the paths (int)
+        depth - nodes on the longest path, the root being 1 (int)
+    -------------------------------------------------------
+    """
+    marked = set()
+    depth = 0
+    for key in keys:
+        length = 0
+        node = bst._root
+        while node is not None:
+            length += 1
+            marked.add(id(node))
+            if key < node._key:
+                node = node._left
+            elif node._key < key:
+                node = node._right
+            else:
+                break
+        if length > depth:
+            depth = length
+    return len(marked), depth
+
+
+def _full_depth(bst):
+    """
+    -------------------------------------------------------
+    Returns the depth reached by a traversal of the whole tree:
+    its height.
+    Use: depth = _full_depth(bst)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+    Returns:
+        depth - deepest level reached, the root being 1 (int)
+    -------------------------------------------------------
+    """
+    return bst.height()
+
+
+def _level_depth(bst, max_depth=None):
+    """
+    -------------------------------------------------------
+    Returns the depth reached by levelorder(max_depth): the
+    height, unless max_depth stops it higher up.
+    Use: depth = _level_depth(bst, max_depth)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        max_depth - number of levels visited, None for all (int)
+    Returns:
+        depth - deepest level reached, the root being 1 (int)
+    -------------------------------------------------------
+    """
+    height = bst.height()
+    return height if max_depth is None else min(max_depth, height)
+
+
+# the depth each traversal reaches, given the traversal's arguments
+_TRAVERSAL_DEPTHS = {
+    "inorder": _full_depth,
+    "preorder": _full_depth,
+    "postorder": _full_depth,
+    "levelorder": _level_depth,
+    "preorder_i": _full_depth,
+}
+
+
+def _wrap_search(bst, stats, op):
+    """
+    -------------------------------------------------------
+    Returns a wrapper for a public search operation of bst that
+    runs it as one recorded operation: the probed searches it
+    makes add their counts to it.
+    Use: wrapper = _wrap_search(bst, stats, op)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        stats - where the costs are recorded (BSTStats)
+        op - name of the operation (str)
+    Returns:
+        wrapper - the instrumented operation (function)
+    -------------------------------------------------------
+    """
+    method = getattr(type(bst), op)
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if stats._counter is not None:
+            return method(bst, *args, **kwargs)
+        counter = _Counter()
+        stats._counter = counter
+        try:
+            return method(bst, *args, **kwargs)
+        finally:
+            stats._counter = None
+            stats.record(op, counter.comparisons, counter.visits, counter.depth)
+    return wrapper
+
+
+def _wrap_probed(bst, stats, name):
+    """
+    -------------------------------------------------------
+    Returns a wrapper for a method of bst that searches for a
+    key: it runs the method with a probe in place of the key and
+    adds the comparisons made, and the nodes compared, to the
+    operation running. A search follows one path from the root,
+    so the nodes compared are both its visits and its depth.
+    A call made outside any recorded operation is recorded on
+    its own. _add stores its key in a new node when the tree has
+    a key function; the probe is replaced by the key there.
+    Use: wrapper = _wrap_probed(bst, stats, name)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        stats - where the costs are recorded (BSTStats)
+        name - name of the method, a key of _PROBED (str)
+    Returns:
+        wrapper - the instrumented method (function)
+    -------------------------------------------------------
+    """
+    method = getattr(type(bst), name)
+    position, op = _PROBED[name]
+
+    @wraps(method)
+    def wrapper(*args):
+        counter = stats._counter
+        alone = counter is None
+        if alone:
+            counter = _Counter()
+            stats._counter = counter
+        key = args[position]
+        probe = _Probe(key, counter)
+        args = args[:position] + (probe,) + args[position + 1:]
+        seen = counter.seen
+        counter.seen = {}
+        try:
+            result = method(bst, *args)
+            if name == "_add" and result[0]._key is probe:
+                result[0]._key = key
+            return result
+        finally:
+            visits = len(counter.seen)
+            counter.seen = seen
+            counter.visits += visits
+            if visits > counter.depth:
+                counter.depth = visits
+            if alone:
+                stats._counter = None
+                stats.record(op, counter.comparisons, counter.visits, counter.depth)
+    return wrapper
+
+
+def _wrap_traversal(bst, stats, op):
+    """
+    -------------------------------------------------------
+    Returns a wrapper for a traversal of bst that runs it and
+    records one visit per element returned. Its depth is the
+    tree height, or less for a level order cut off by max_depth.
+    Use: wrapper = _wrap_traversal(bst, stats, op)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        stats - where the costs are recorded (BSTStats)
+        op - name of the operation (str)
+    Returns:
+        wrapper - the instrumented operation (function)
+    -------------------------------------------------------
+    """
+    method = getattr(type(bst), op)
+    reached = _TRAVERSAL_DEPTHS[op]
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if stats._counter is not None:
+            return method(bst, *args, **kwargs)
+        stats._counter = _Counter()
+        try:
+            values = method(bst, *args, **kwargs)
+        finally:
+            stats._counter = None
+        stats.record(op, 0, len(values), reached(bst, *args, **kwargs))
+        return values
+    return wrapper
+
+
+def _wrap_irange(bst, stats):
+    """
+    -------------------------------------------------------
+    Returns a wrapper for irange that runs it with probes in
+    place of its bounds and records, once the generator is
+    finished or closed, the comparisons made against them. The
+    nodes visited are those on the root paths to the nodes the
+    walk compared or generated, so a bounded or abandoned scan
+    counts only the part of the tree it actually reached.
+    Use: wrapper = _wrap_irange(bst, stats)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        stats - where the costs are recorded (BSTStats)
+    Returns:
+        wrapper - the instrumented operation (function)
+    -------------------------------------------------------
+    """
+    method = type(bst).irange
+
+    def counted(low, high, reverse):
+        # a counter of its own: generators may interleave
+        counter = _Counter()
+        reached = counter.seen
+        if low is not None:
+            low = _Probe(low, counter)
+        if high is not None:
+            high = _Probe(high, counter)
+        try:
+            for value in method(bst, low, high, reverse):
+                key = bst._key_of(value)
+                reached[id(key)] = key
+                yield value
+        finally:
+            visits, depth = _paths(bst, reached.values())
+            stats.record("irange", counter.comparisons, visits, depth)
+
+    @wraps(method)
+    def wrapper(low=None, high=None, reverse=False):
+        if stats._counter is not None:
+            return method(bst, low, high, reverse)
+        return counted(low, high, reverse)
+    return wrapper
+
+
+def _wrap_ilevelorder(bst, stats):
+    """
+    -------------------------------------------------------
+    Returns a wrapper for ilevelorder that records, once the
+    generator is finished or closed, one visit per element
+    generated and the level of the last one, the deepest the
+    walk reached.
+    Use: wrapper = _wrap_ilevelorder(bst, stats)
+    -------------------------------------------------------
+    Parameters:
+        bst - the tree being measured (BST)
+        stats - where the costs are recorded (BSTStats)
+    Returns:
+        wrapper - the instrumented operation (function)
+    -------------------------------------------------------
+    """
+    method = type(bst).ilevelorder
+
+    def counted(max_depth):
+        visits = 0
+        last = []
+        try:
+            for value in method(bst, max_depth):
+                visits += 1
+                last = [value]
+                yield value
+        finally:
+            _, depth = _paths(bst, [bst._key_of(value) for value in last])
+            stats.record("ilevelorder", 0, visits, depth)
+
+    @wraps(method)
+    def wrapper(max_depth=None):
+        if stats._counter is not None:
+            return method(bst, max_depth)
+        return counted(max_depth)
+    return wrapper
+
+
+def instrument(bst):
+    """
+    -------------------------------------------------------
+    Starts recording the cost of the operations on bst. The
+    statistics are kept in the returned object until
+    uninstrument is called. element in bst is recorded as a
+    find_key. Not thread-safe.
+    Use: stats = instrument(bst)
+    -------------------------------------------------------
+    Parameters:
+        bst - a BST that is not persistent (BST)
+    Returns:
+        stats - the statistics of bst (BSTStats)
+    -------------------------------------------------------
+    """
+    # versions of a persistent tree copy the instance attributes,
+    # so the wrappers would keep measuring the first version
+    assert not isinstance(bst, PersistentBST), "Cannot instrument a PersistentBST"
+    assert "_stats" not in vars(bst), "BST is already instrumented"
+
+    stats = BSTStats(bst)
+    bst._stats = stats
+    for op in _SEARCHES:
+        setattr(bst, op, _wrap_search(bst, stats, op))
+    for name in _PROBED:
+        setattr(bst, name, _wrap_probed(bst, stats, name))
+    for op in _TRAVERSALS:
+        setattr(bst, op, _wrap_traversal(bst, stats, op))
+    bst.irange = _wrap_irange(bst, stats)
+    bst.ilevelorder = _wrap_ilevelorder(bst, stats)
+    return stats
+
+
+def uninstrument(bst):
+    """
+    -------------------------------------------------------
+    Stops recording the cost of the operations on bst and
+    removes the wrappers, so bst runs the class methods again.
+    Use: uninstrument(bst)
+    -------------------------------------------------------
+    Parameters:
+        bst - an instrumented BST (BST)
+    Returns:
+        stats - the statistics recorded for bst (BSTStats)
+    -------------------------------------------------------
+    """
+    assert "_stats" in vars(bst), "BST is not instrumented"
+
+    for op in _SEARCHES + tuple(_PROBED) + _TRAVERSALS + _GENERATORS:
+        delattr(bst, op)
+    stats = bst._stats
+    del bst._stats
+    return stats
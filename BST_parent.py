@@ -0,0 +1,139 @@
+"""
+-------------------------------------------------------
+Parent-pointer version of the BST ADT.
+Every node also links to its parent, so from any node the
+tree can be walked to the inorder successor or predecessor in
+O(1) amortized time, with no stack and no search from the
+root. The node's _update links its children back to it.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from BST import _NO_KEY, BST, BSTNode
+
+
+class BSTParentNode(BSTNode):
+    __slots__ = ("_parent",)
+
+    def __init__(self, data, key=_NO_KEY):
+        """
+        -------------------------------------------------------
+        Initializes a BST node containing the data. Child and
+        parent pointers are None.
+        Use: node = BSTParentNode(element)
+        -------------------------------------------------------
+        Parameters:
+            data - data for the node (?)
+            key - the key of data, omitted if data is its own key (?)
+        Returns:
+            A BSTParentNode object (BSTParentNode)
+        -------------------------------------------------------
+        """
+        BSTNode.__init__(self, data, key)
+        self._parent = None
+
+    def _update(self):
+        """
+        -------------------------------------------------------
+        Recomputes the cached height and size of the node and
+        links its children back to it.
+        Use: node._update()
+        -------------------------------------------------------
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        BSTNode._update(self)
+        if self._left is not None:
+            self._left._parent = self
+        if self._right is not None:
+            self._right._parent = self
+        return
+
+
+class ParentBST(BST):
+    # The parent link of the root is not cleared when another node
+    # takes its place, so walks upward stop at _root instead.
+    _node_class = BSTParentNode
+
+    def next_node(self, node):
+        """
+        -------------------------------------------------------
+        Returns the node that follows node in inorder: the
+        leftmost node of its right subtree, or else the nearest
+        ancestor that has node in its left subtree. Walking the
+        whole tree this way costs O(n), O(1) amortized per step.
+        Use: node = bst.next_node(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a node of bst, e.g. returned by find (BSTParentNode)
+        Returns:
+            node - the next node in inorder, None if node holds the
+                largest element (BSTParentNode)
+        -------------------------------------------------------
+        """
+        if node._right is not None:
+            node = node._right
+            while node._left is not None:
+                node = node._left
+        else:
+            root = self._root
+            while node is not root and node._parent._right is node:
+                node = node._parent
+            node = None if node is root else node._parent
+        return node
+
+    def prev_node(self, node):
+        """
+        -------------------------------------------------------
+        Returns the node that precedes node in inorder. O(1)
+        amortized per step.
+        Use: node = bst.prev_node(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a node of bst, e.g. returned by find (BSTParentNode)
+        Returns:
+            node - the previous node in inorder, None if node holds
+                the smallest element (BSTParentNode)
+        -------------------------------------------------------
+        """
+        if node._left is not None:
+            node = node._left
+            while node._right is not None:
+                node = node._right
+        else:
+            root = self._root
+            while node is not root and node._parent._left is node:
+                node = node._parent
+            node = None if node is root else node._parent
+        return node
+
+    def page(self, node, count, reverse=False):
+        """
+        -------------------------------------------------------
+        Returns up to count elements in inorder (or reverse
+        inorder) starting with the element in node, together with
+        the node to start the next page at. Keeping that node
+        between calls pages through the tree with no stack and no
+        search from the root. Nodes are only valid while the tree
+        is not changed: a delete may detach the node a cursor holds.
+        Use: values, node = bst.page(node, count)
+        -------------------------------------------------------
+        Parameters:
+            node - the first node of the page, e.g. from find or
+                findMin; None for an empty page (BSTParentNode)
+            count - the largest number of elements to return (int >= 0)
+            reverse - True to page from larger to smaller elements (boolean)
+        Returns:
+            values - the elements of the page (list of ?)
+            node - the first node of the next page, None if the
+                page reached the end of the tree (BSTParentNode)
+        -------------------------------------------------------
+        """
+        assert count >= 0, "count must be >= 0"
+
+        values = []
+        step = self.prev_node if reverse else self.next_node
+        while node is not None and len(values) < count:
+            values.append(node._data)
+            node = step(node)
+        return values, node
@@ -0,0 +1,315 @@
+"""
+-------------------------------------------------------
+Persistent (path-copying) version of the BST ADT.
+A PersistentBST is never changed once built: insert and delete
+return a new version that copies only the O(log n) nodes on the
+search path and shares every other node with the old version.
+Any number of versions can therefore be read at the same time,
+and taking a snapshot is O(1).
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from copy import deepcopy
+
+from BST import BST, BSTNode
+
+
+class PersistentBST(BST):
+
+    def __init__(self, balanced=True, key=None):
+        """
+        -------------------------------------------------------
+        Initializes an empty persistent BST. By default versions
+        are kept height balanced (AVL), so every update copies
+        O(log n) nodes.
+        Use: tree = PersistentBST()
+        -------------------------------------------------------
+        Parameters:
+            balanced - True to keep versions height balanced (boolean)
+            key - a function returning the value to order an element
+                by, None to compare the elements (function)
+        Returns:
+            A PersistentBST object (PersistentBST)
+        -------------------------------------------------------
+        """
+        BST.__init__(self, balanced=balanced, key=key)
+
+    def _version(self):
+        """
+        -------------------------------------------------------
+        Returns a new version sharing every node with this one.
+        Use: tree = self._version()
+        -------------------------------------------------------
+        Returns:
+            tree - a PersistentBST with the same root (PersistentBST)
+        -------------------------------------------------------
+        """
+        tree = PersistentBST.__new__(type(self))
+        tree.__dict__.update(self.__dict__)
+        return tree
+
+    def _copy(self, node):
+        """
+        -------------------------------------------------------
+        Returns a new node with the same data, children and cached
+        values as node. The data itself is shared.
+        Use: copy = self._copy(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node (BSTNode)
+        Returns:
+            copy - a copy of node (BSTNode)
+        -------------------------------------------------------
+        """
+        copy = BSTNode.__new__(BSTNode)
+        copy._data = node._data
+        copy._key = node._key
+        copy._left = node._left
+        copy._right = node._right
+        copy._height = node._height
+        copy._size = node._size
+        return copy
+
+    def snapshot(self):
+        """
+        -------------------------------------------------------
+        Returns a read snapshot of the tree. Versions never change,
+        so the snapshot is the version itself. (O(1))
+        Use: snapshot = tree.snapshot()
+        -------------------------------------------------------
+        Returns:
+            snapshot - this version of the tree (PersistentBST)
+        -------------------------------------------------------
+        """
+        return self
+
+    def insert(self, element):
+        """
+        -------------------------------------------------------
+        Returns a new version of the tree that also contains a
+        copy of element. The data element may appear only once in
+        the tree. This version is unchanged.
+        Use: tree = tree.insert(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data to be inserted (?)
+        Returns:
+            tree - the new version (PersistentBST)
+        -------------------------------------------------------
+        """
+        tree = self._version()
+        BST.insert(tree, element)
+        return tree
+
+    def delete(self, element):
+        """
+        -------------------------------------------------------
+        Returns a new version of the tree without element. A node
+        with two children is replaced by a copy holding the data
+        of its inorder successor. This version is unchanged.
+        Use: tree = tree.delete(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data element to be deleted (?)
+        Returns:
+            tree - the new version (PersistentBST)
+        -------------------------------------------------------
+        """
+        return self._delete(self._key_of(element))
+
+    def delete_key(self, key):
+        """
+        -------------------------------------------------------
+        Returns a new version of the tree without the element with
+        the given key. This version is unchanged.
+        Use: tree = tree.delete_key(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key of the element to be deleted (?)
+        Returns:
+            tree - the new version (PersistentBST)
+        -------------------------------------------------------
+        """
+        return self._delete(key)
+
+    def _delete(self, key):
+        """
+        -------------------------------------------------------
+        Returns a new version of the tree without the element with
+        the given key. Private operation called by delete and 
+        remove_root.
+        Use: tree = self._delete(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key of the element to be deleted (?)
+        Returns:
+            tree - the new version (PersistentBST)
+        -------------------------------------------------------
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < key:
+                path.append((node, False))
+                node = node._right
+            else:
+                break
+
+        tree = self._version()
+        if node is not None:
+            if node._left is not None and node._right is not None:
+                # copy the node now, so it can take the successor's data
+                node = self._copy(node)
+                path.append((node, False))
+                successor = node._right
+                while successor._left is not None:
+                    path.append((successor, True))
+                    successor = successor._left
+                node._take(successor)
+                node = successor
+                replacement = successor._right
+            elif node._left is None:
+                replacement = node._right
+            else:
+                replacement = node._left
+            tree._height_total -= node._height
+            tree._retrace(path, replacement)
+        return tree
+
+    def remove_root(self):
+        """
+        -------------------------------------------------------
+        Returns the data element in the root along with a new
+        version of the tree without it.
+        Use: element, tree = tree.remove_root()
+        -------------------------------------------------------
+        Returns:
+            element - the data element in root (?)
+            tree - the new version (PersistentBST)
+        -------------------------------------------------------
+        """
+        assert self._root is not None, "Cannot remove root from an empty BST"
+        element = deepcopy(self._root._data)
+        return element, self._delete(self._root._key)
+
+    def split(self, key):
+        """
+        -------------------------------------------------------
+        Returns two new versions: one with the elements whose keys
+        are smaller than key and one with the rest. Only O(log n)
+        nodes are copied; this version is unchanged.
+        Use: low, high = tree.split(key)
+        -------------------------------------------------------
+        Parameters:
+            key - the key to split at (?)
+        Returns:
+            low - the elements with keys smaller than key (PersistentBST)
+            high - the elements with keys >= key (PersistentBST)
+        -------------------------------------------------------
+        """
+        # split on a scratch version so this version's aggregates
+        # are left alone
+        scratch = self._version()
+        low_root, high_root = scratch._split(scratch._root, key)
+        low = self._version()
+        low._root = low_root
+        low._stale = True
+        high = self._version()
+        high._root = high_root
+        high._stale = True
+        return low, high
+
+    @classmethod
+    def join(cls, left, right):
+        """
+        -------------------------------------------------------
+        Returns a new version containing the elements of left and
+        right, where every element of left is smaller than every
+        element of right. left and right are unchanged.
+        Use: tree = PersistentBST.join(left, right)
+        -------------------------------------------------------
+        Parameters:
+            left - the tree of smaller elements (PersistentBST)
+            right - the tree of larger elements (PersistentBST)
+        Returns:
+            tree - the joined version (PersistentBST)
+        -------------------------------------------------------
+        """
+        assert left._precedes(right), "Trees must not overlap"
+
+        tree = left._version()
+        tree._root = tree._join2(left._root, right._root)
+        tree._stale = True
+        return tree
+
+    def _relink(self, path, node):
+        """
+        -------------------------------------------------------
+        Copies the nodes on path, then links node in and updates
+        the copies bottom-up as BST._relink does. Nodes that are
+        already fresh copies may be copied again; that costs O(1)
+        per level.
+        Use: root = self._relink(path, node)
+        -------------------------------------------------------
+        Parameters:
+            path - (parent, is_left) pairs from the top of the subtree
+                down to the parent of the changed subtree (list of tuple)
+            node - the new root of the changed subtree (BSTNode)
+        Returns:
+            node - the new root of the copied subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        path = [(self._copy(parent), is_left) for parent, is_left in path]
+        return BST._relink(self, path, node)
+
+    def _join(self, left, node, right):
+        """
+        -------------------------------------------------------
+        Joins the subtrees left and right with a copy of node 
+        between them, as BST._join does.
+        Use: root = self._join(left, node, right)
+        -------------------------------------------------------
+        Parameters:
+            left - root of a subtree of smaller elements (BSTNode)
+            node - a node whose data lies between the subtrees (BSTNode)
+            right - root of a subtree of larger elements (BSTNode)
+        Returns:
+            root - the root of the joined subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        return BST._join(self, left, self._copy(node), right)
+
+    def _rotate_left(self, node):
+        """
+        -------------------------------------------------------
+        Rotates a copy of node and its right child to the left.
+        Use: node = self._rotate_left(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node with a right child (BSTNode)
+        Returns:
+            pivot - the new root of the copied subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        node = self._copy(node)
+        node._right = self._copy(node._right)
+        return BST._rotate_left(self, node)
+
+    def _rotate_right(self, node):
+        """
+        -------------------------------------------------------
+        Rotates a copy of node and its left child to the right.
+        Use: node = self._rotate_right(node)
+        -------------------------------------------------------
+        Parameters:
+            node - a BST node with a left child (BSTNode)
+        Returns:
+            pivot - the new root of the copied subtree (BSTNode)
+        -------------------------------------------------------
+        """
+        node = self._copy(node)
+        node._left = self._copy(node._left)
+        return BST._rotate_right(self, node)
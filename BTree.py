@@ -0,0 +1,421 @@
+"""
+-------------------------------------------------------
+Linked version of the B-tree ADT: an ordered set stored in
+high-fanout nodes. Every node holds a sorted Python list of
+between t-1 and 2t-1 elements (the root may hold fewer),
+searched with bisect, so a lookup visits only log_t(n) nodes.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from bisect import bisect_left
+from copy import deepcopy
+
+
+class BTreeNode:
+    __slots__ = ("_keys", "_children")
+
+    def __init__(self):
+        """
+        -------------------------------------------------------
+        Initializes an empty B-tree node. A leaf has no children;
+        an internal node with k elements has k+1 children.
+        Use: node = BTreeNode()
+        -------------------------------------------------------
+        Returns:
+            A BTreeNode object (BTreeNode)
+        -------------------------------------------------------
+        """
+        self._keys = []
+        self._children = []
+
+    def __str__(self):
+        """
+        USE FOR TESTING ONLY
+        -------------------------------------------------------
+        Returns node data as a string - for debugging.
+        -------------------------------------------------------
+        """
+        return "{} {} {}".format("{", self._keys, "}")
+
+
+class BTree:
+    """
+    -------------------------------------------------------
+    Constants
+    -------------------------------------------------------
+    """
+    # default minimum degree: nodes hold 31 to 63 elements
+    DEFAULT_DEGREE = 32
+
+    def __init__(self, degree=DEFAULT_DEGREE):
+        """
+        -------------------------------------------------------
+        Initializes an empty B-tree.
+        Use: tree = BTree(degree)
+        Use: tree = BTree()    # uses default degree
+        -------------------------------------------------------
+        Parameters:
+            degree - minimum degree t of the tree; every node but the
+                root holds t-1 to 2t-1 elements (int >= 2)
+        Returns:
+            A BTree object (BTree)
+        -------------------------------------------------------
+        """
+        assert degree >= 2, "B-tree degree must be >= 2"
+
+        self._degree = degree
+        self._root = BTreeNode()
+        self._count = 0
+
+    def isEmpty(self):
+        """
+        -------------------------------------------------------
+        Determines if the B-tree is empty.
+        Use: b = tree.isEmpty()
+        -------------------------------------------------------
+        Returns:
+            True if tree is empty, False otherwise.
+        -------------------------------------------------------
+        """
+        return self._count == 0
+
+    def __len__(self):
+        """
+        -------------------------------------------------------
+        Returns the number of elements in the B-tree.
+        Use: n = len(tree)
+        -------------------------------------------------------
+        Returns:
+            the number of elements in tree.
+        -------------------------------------------------------
+        """
+        return self._count
+
+    def _split_child(self, parent, i):
+        """
+        -------------------------------------------------------
+        Splits the full i-th child of parent into two nodes of
+        t-1 elements and moves its median element up into parent.
+        Use: self._split_child(parent, i)
+        -------------------------------------------------------
+        Parameters:
+            parent - a node that is not full (BTreeNode)
+            i - index of a full child of parent (int)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        t = self._degree
+        child = parent._children[i]
+        right = BTreeNode()
+        right._keys = child._keys[t:]
+        median = child._keys[t - 1]
+        del child._keys[t - 1:]
+        if child._children:
+            right._children = child._children[t:]
+            del child._children[t:]
+        parent._keys.insert(i, median)
+        parent._children.insert(i + 1, right)
+        return
+
+    def insert(self, element):
+        """
+        -------------------------------------------------------
+        Inserts a copy of data element into the B-tree. The data
+        element may appear only once in the tree. Full nodes are
+        split on the way down, so the insert is a single pass.
+        Use: tree.insert(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data to be inserted into tree (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        full = 2 * self._degree - 1
+        if len(self._root._keys) == full:
+            root = BTreeNode()
+            root._children.append(self._root)
+            self._split_child(root, 0)
+            self._root = root
+
+        node = self._root
+        while True:
+            keys = node._keys
+            i = bisect_left(keys, element)
+            if i < len(keys) and not element < keys[i]:
+                print("The element is already in the tree")
+                return None
+            if not node._children:
+                keys.insert(i, deepcopy(element))
+                self._count += 1
+                return None
+            if len(node._children[i]._keys) == full:
+                self._split_child(node, i)
+                if keys[i] < element:
+                    i += 1
+                elif not element < keys[i]:
+                    print("The element is already in the tree")
+                    return None
+            node = node._children[i]
+
+    def find(self, element):
+        """
+        -------------------------------------------------------
+        Returns the node in the B-tree containing the given
+        element. Returns None if the tree does not contain it.
+        (Iterative)
+        Use: node = tree.find(element)
+        -------------------------------------------------------
+        Parameters:
+            element - element to search for (?)
+        Returns:
+            node - The node containing the given element, None if
+            the element is not found (BTreeNode)
+        -------------------------------------------------------
+        """
+        node = self._root
+        while True:
+            keys = node._keys
+            i = bisect_left(keys, element)
+            if i < len(keys) and not element < keys[i]:
+                return node
+            if not node._children:
+                return None
+            node = node._children[i]
+
+    def retrieve(self, key):
+        """
+        -------------------------------------------------------
+        Retrieves a copy of a value matching key in the B-tree.
+        (Iterative)
+        Use: v = tree.retrieve(key)
+        -------------------------------------------------------
+        Parameters:
+            key - data to search for (?)
+        Returns:
+            value - the element matching key, otherwise None (?)
+        -------------------------------------------------------
+        """
+        value = None
+        node = self.find(key)
+        if node is not None:
+            value = deepcopy(node._keys[bisect_left(node._keys, key)])
+        return value
+
+    def __contains__(self, element):
+        """
+        ---------------------------------------------------------
+        Determines if the B-tree contains the given element.
+        Use: b = element in tree
+        -------------------------------------------------------
+        Parameters:
+            element - a comparable data element (?)
+        Returns:
+            True if tree contains element, False otherwise (boolean)
+        -------------------------------------------------------
+        """
+        return self.find(element) is not None
+
+    def _merge_children(self, node, i):
+        """
+        -------------------------------------------------------
+        Merges the (i+1)-th child of node and the i-th element of
+        node into the i-th child. Both children must hold t-1
+        elements.
+        Use: self._merge_children(node, i)
+        -------------------------------------------------------
+        Parameters:
+            node - an internal node (BTreeNode)
+            i - index of the left child to merge into (int)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        left = node._children[i]
+        right = node._children.pop(i + 1)
+        left._keys.append(node._keys.pop(i))
+        left._keys.extend(right._keys)
+        left._children.extend(right._children)
+        return
+
+    def delete(self, element):
+        """
+        -------------------------------------------------------
+        deletes the given element from the B-tree. Every child is
+        topped up to at least t elements (by borrowing from a
+        sibling or merging) before the search descends into it,
+        so the delete is a single pass.
+        Use: tree.delete(element)
+        -------------------------------------------------------
+        Parameters:
+            element - data element to be deleted (?)
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        t = self._degree
+        node = self._root
+        while True:
+            keys = node._keys
+            children = node._children
+            i = bisect_left(keys, element)
+            found = i < len(keys) and not element < keys[i]
+
+            if not children:
+                if found:
+                    del keys[i]
+                    self._count -= 1
+                break
+
+            if found:
+                left = children[i]
+                right = children[i + 1]
+                if len(left._keys) >= t:
+                    # replace with the largest element of the left subtree
+                    last = left
+                    while last._children:
+                        last = last._children[-1]
+                    element = keys[i] = last._keys[-1]
+                    node = left
+                elif len(right._keys) >= t:
+                    # replace with the smallest element of the right subtree
+                    first = right
+                    while first._children:
+                        first = first._children[0]
+                    element = keys[i] = first._keys[0]
+                    node = right
+                else:
+                    self._merge_children(node, i)
+                    node = left
+            else:
+                child = children[i]
+                if len(child._keys) < t:
+                    if i > 0 and len(children[i - 1]._keys) >= t:
+                        # borrow through node from the left sibling
+                        sibling = children[i - 1]
+                        child._keys.insert(0, keys[i - 1])
+                        keys[i - 1] = sibling._keys.pop()
+                        if sibling._children:
+                            child._children.insert(0, sibling._children.pop())
+                    elif i < len(keys) and len(children[i + 1]._keys) >= t:
+                        # borrow through node from the right sibling
+                        sibling = children[i + 1]
+                        child._keys.append(keys[i])
+                        keys[i] = sibling._keys.pop(0)
+                        if sibling._children:
+                            child._children.append(sibling._children.pop(0))
+                    elif i < len(keys):
+                        self._merge_children(node, i)
+                    else:
+                        self._merge_children(node, i - 1)
+                        child = children[i - 1]
+                node = child
+
+        root = self._root
+        if not root._keys and root._children:
+            # the root's last element was merged into its only child
+            self._root = root._children[0]
+        return
+
+    def inorder(self):
+        """
+        -------------------------------------------------------
+        Returns a Python list containing the contents of the tree
+        in inorder order. (Iterative)
+        Use: a = tree.inorder()
+        -------------------------------------------------------
+        Returns:
+            a - copy of the contents of the tree in inorder (Python list of ?)
+        -------------------------------------------------------
+        """
+        a = []
+        # each entry is a node and the index of the next child to visit
+        stack = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if not node._children:
+                a.extend(node._keys)
+            else:
+                if i > 0:
+                    a.append(node._keys[i - 1])
+                if i < len(node._keys):
+                    stack.append((node, i + 1))
+                stack.append((node._children[i], 0))
+        return a
+
+    def min(self):
+        """
+        -------------------------------------------------------
+        Finds the minimum element in the B-tree.
+        Use: element = tree.min()
+        -------------------------------------------------------
+        Returns:
+            element - a copy of the minimum element in the tree (?)
+        -------------------------------------------------------
+        """
+        assert self._count > 0, "Cannot find minimum of an empty BTree"
+        node = self._root
+        while node._children:
+            node = node._children[0]
+        return deepcopy(node._keys[0])
+
+    def max(self):
+        """
+        -------------------------------------------------------
+        Finds the maximum element in the B-tree.
+        Use: element = tree.max()
+        -------------------------------------------------------
+        Returns:
+            element - a copy of the maximum element in the tree (?)
+        -------------------------------------------------------
+        """
+        assert self._count > 0, "Cannot find maximum of an empty BTree"
+        node = self._root
+        while node._children:
+            node = node._children[-1]
+        return deepcopy(node._keys[-1])
+
+    def height(self):
+        """
+        -------------------------------------------------------
+        Returns the height of the B-tree, i.e. the number of nodes
+        on every path from the root to a leaf.
+        Use: h = tree.height()
+        -------------------------------------------------------
+        Returns:
+            h - height of tree, 0 if tree is empty (int)
+        -------------------------------------------------------
+        """
+        h = 0
+        if self._count > 0:
+            node = self._root
+            h = 1
+            while node._children:
+                node = node._children[0]
+                h += 1
+        return h
+
+    def __iter__(self):
+        """
+        -------------------------------------------------------
+        Generates a Python iterator. Iterates through the B-tree
+        in inorder.
+        Use: for v in tree:
+        -------------------------------------------------------
+        Returns:
+            yields
+            value - the next element in the tree (?)
+        -------------------------------------------------------
+        """
+        stack = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if not node._children:
+                yield from node._keys
+            else:
+                if i > 0:
+                    yield node._keys[i - 1]
+                if i < len(node._keys):
+                    stack.append((node, i + 1))
+                stack.append((node._children[i], 0))
@@ -0,0 +1,171 @@
+"""
+-------------------------------------------------------
+Interval tree version of the BST ADT: an ordered set of
+intervals, each node also caching the largest end point in its
+subtree. The tree is ordered by interval start, so a subtree
+whose largest end point is below the query, or whose starts
+are all above it, holds no overlapping interval and is skipped.
+The node's _update recomputes the largest end point.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from BST import _NO_KEY, BST, BSTNode
+
+
+class IntervalNode(BSTNode):
+    __slots__ = ("_max_end",)
+
+    def __init__(self, data, key=_NO_KEY):
+        """
+        -------------------------------------------------------
+        Initializes an interval node containing the data. Child
+        pointers are None. The key of the data is its interval:
+        a sequence whose first two items are its start and end.
+        Use: node = IntervalNode(element)
+        -------------------------------------------------------
+        Parameters:
+            data - data for the node (?)
+            key - the interval of data, omitted if data is its own
+                interval (tuple)
+        Returns:
+            An IntervalNode object (IntervalNode)
+        -------------------------------------------------------
+        """
+        BSTNode.__init__(self, data, key)
+        assert not self._key[1] < self._key[0], "Interval end must not be below its start"
+
+        self._max_end = self._key[1]
+
+    def _update(self):
+        """
+        -------------------------------------------------------
+        Recomputes the cached height, size and largest end point
+        of the node from the cached values of its children.
+        Use: node._update()
+        -------------------------------------------------------
+        Returns:
+            None
+        -------------------------------------------------------
+        """
+        BSTNode._update(self)
+        max_end = self._key[1]
+        if self._left is not None and max_end < self._left._max_end:
+            max_end = self._left._max_end
+        if self._right is not None and max_end < self._right._max_end:
+            max_end = self._right._max_end
+        self._max_end = max_end
+        return
+
+
+class IntervalTree(BST):
+    _node_class = IntervalNode
+
+    def __init__(self, balanced=True, key=None):
+        """
+        -------------------------------------------------------
+        Initializes an empty interval tree. Intervals are closed:
+        (1, 3) and (3, 5) overlap. Elements with equal intervals
+        are equal, so for labelled intervals either store tuples
+        (start, end, label) or give a key. The tree is AVL by
+        default, and so are the trees built by from_sorted,
+        from_iterable and load unless they are given balanced=False.
+        Use: tree = IntervalTree()
+        Use: tree = IntervalTree(key=lambda booking: booking.slot)
+        -------------------------------------------------------
+        Parameters:
+            balanced - True to keep the tree height balanced (boolean)
+            key - a function returning the interval (start, end) of
+                an element, None if the elements are intervals
+                (function)
+        Returns:
+            An IntervalTree object (IntervalTree)
+        -------------------------------------------------------
+        """
+        BST.__init__(self, balanced=balanced, key=key)
+
+    def find_overlap(self, low, high):
+        """
+        -------------------------------------------------------
+        Returns an element whose interval overlaps [low, high],
+        following a single path down the tree. O(log n) in AVL mode.
+        Use: element = tree.find_overlap(low, high)
+        -------------------------------------------------------
+        Parameters:
+            low - start of the query interval (?)
+            high - end of the query interval (?)
+        Returns:
+            element - an element overlapping [low, high], None if
+                there is none (?)
+        -------------------------------------------------------
+        """
+        node = self._root
+        while node is not None and (high < node._key[0] or node._key[1] < low):
+            left = node._left
+            # the left subtree can only be passed over if no end point
+            # in it reaches low: then none to the right starts early enough
+            if left is not None and not left._max_end < low:
+                node = left
+            else:
+                node = node._right
+        return None if node is None else node._data
+
+    def overlapping(self, low, high):
+        """
+        -------------------------------------------------------
+        Returns the elements whose intervals overlap [low, high],
+        i.e. start <= high and end >= low, in order of their
+        intervals. Subtrees whose largest end point is below low
+        are skipped, and the search stops at the first start above
+        high, so only the paths to the k elements returned are
+        walked: O(log n + k log(n / k)) in AVL mode, against O(n)
+        for a scan of inorder().
+        Use: a = tree.overlapping(low, high)
+        -------------------------------------------------------
+        Parameters:
+            low - start of the query interval (?)
+            high - end of the query interval (?)
+        Returns:
+            a - the overlapping elements (Python list of ?)
+        -------------------------------------------------------
+        """
+        assert not high < low, "high must not be below low"
+
+        values = []
+        stack = []
+        node = self._root
+        while True:
+            while node is not None and not node._max_end < low:
+                stack.append(node)
+                node = node._left
+            if not stack:
+                break
+            node = stack.pop()
+            if high < node._key[0]:
+                # every later interval starts above high
+                break
+            if not node._key[1] < low:
+                values.append(node._data)
+            node = node._right
+        return values
+
+    def is_consistent(self):
+        """
+        ---------------------------------------------------------
+        Checks the cached values as BST.is_consistent does, and
+        also the largest end point cached in every node.
+        FOR TESTING: O(n).
+        Use: b = tree.is_consistent()
+        ---------------------------------------------------------
+        Returns:
+            consistent - True if the tree is consistent (boolean)
+        ---------------------------------------------------------
+        """
+        consistent = BST.is_consistent(self)
+        for node in self._nodes(self._root):
+            max_end = node._key[1]
+            for child in (node._left, node._right):
+                if child is not None and max_end < child._max_end:
+                    max_end = child._max_end
+            if max_end != node._max_end:
+                consistent = False
+        return consistent
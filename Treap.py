@@ -0,0 +1,357 @@
+"""
+-------------------------------------------------------
+Treap version of the BST ADT: an ordered set whose nodes also
+carry a random priority. The tree is a BST by key and a heap by
+priority (no node has a higher priority than its parent), which
+makes its shape that of a BST built from the keys in random
+order: O(log n) expected height whatever the insertion order,
+with no balance information to check or repair. Insert adds a
+leaf and rotates it up past parents of lower priority; delete
+rotates the node down to a leaf. Split and join (merge) take
+one O(log n) expected pass and also back the range deletes.
+-------------------------------------------------------
+"""
+# pylint: disable=W0212
+from random import random
+
+from BST import _NO_KEY, BST, BSTNode
+
+
+class TreapNode(BSTNode):
+    __slots__ = ("_priority",)
+
+    def __init__(self, data, key=_NO_KEY):
+        """
+        -------------------------------------------------------
+        Initializes a treap node containing the data, with a
+        random priority. Child pointers are None.
+        Use: node = TreapNode(element)
+        -------------------------------------------------------
+        Parameters:
+            data - data for the node (?)
+            key - the key of data, omitted if data is its own key (?)
+        Returns:
+            A TreapNode object (TreapNode)
+        -------------------------------------------------------
+        """
+        BSTNode.__init__(self, data, key)
+        self._priority = random()
+
+
+class Treap(BST):
+    _node_class = TreapNode
+
+    def __init__(self, balanced=False, key=None):
+        """
+        -------------------------------------------------------
+        Initializes an empty treap. Priorities come from the
+        random module, so random.seed makes a run repeatable.
+        Use: treap = Treap()
+        -------------------------------------------------------
+        Parameters:
+            balanced - must be False: a treap is kept balanced by
+                its priorities, not by AVL rotations (boolean)
+            key - a function returning the value to order an element
+                by, None to compare the elements (function)
+        Returns:
+            A Treap object (Treap)
+        -------------------------------------------------------
+        """
+        assert not balanced, "A Treap cannot run in AVL mode"
+
+        BST.__init__(self, key=key)
+
+    def _add(self, element, key):
+        """
+        -------------------------------------------------------
+        Returns the node with the given key, first adding a node
+        for element if the treap has none. The new node is linked
+        in as a leaf and rotated up while its priority is higher
+        than its parent's (fewer than 2 rotations expected).
+        Use: node, added = self._add(element, key)
+        -------------------------------------------------------
+        Parameters:
+            element - data to be inserted if key is not found (?)
+            key - the key of element (?)
+        Returns:
+            node - the node with key (TreapNode)
+            added - True if the node was added, False if it was
+                already in the tree (boolean)
+        -------------------------------------------------------
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < key:
+                path.append((node, False))
+                node = node._right
+            else:
+                return node, False
+
+        node = self._node_class(element, _NO_KEY if self._keyfunc is None else key)
+        new_node = node
+        if path and path[-1][0]._priority < node._priority:
+            # link the leaf in, then rotate it up
+            self._relink(path[-1:], node)
+            while path and path[-1][0]._priority < node._priority:
+                parent, is_left = path.pop()
+                if is_left:
+                    node = self._rotate_right(parent)
+                else:
+                    node = self._rotate_left(parent)
+                if path:
+                    above, above_left = path[-1]
+                    if above_left:
+                        above._left = node
+                    else:
+                        above._right = node
+        elif path:
+            # the bottom parent gains a child
+            parent, is_left = path[-1]
+            if (parent._right if is_left else parent._left) is not None:
+                self._twos += 1
+
+        # No rebalancing is needed on the way back up, so the cached
+        # values of the ancestors are updated here directly rather
+        # than through _retrace: each gains one node below it, and a
+        # rotation may have made its subtree taller or shorter.
+        total = self._height_total + 1
+        while path:
+            parent, is_left = path.pop()
+            if is_left:
+                parent._left = node
+            else:
+                parent._right = node
+            parent._size += 1
+            other = parent._right if is_left else parent._left
+            if other is not None and other._height > node._height:
+                height = other._height + 1
+            else:
+                height = node._height + 1
+            total += height - parent._height
+            parent._height = height
+            node = parent
+        self._height_total = total
+        self._root = node
+        return new_node, True
+
+    def _delete(self, key):
+        """
+        -------------------------------------------------------
+        Deletes the node whose element has the given key. The node
+        is rotated down, past its child of higher priority, until
+        it has at most one child, and is then unlinked.
+        Use: removed = self._delete(key)
+        -------------------------------------------------------
+        Parameters:
+            key - key of the element to be deleted (?)
+        Returns:
+            removed - the unlinked node, None if key is not in the
+                treap (TreapNode)
+        -------------------------------------------------------
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            if key < node._key:
+                path.append((node, True))
+                node = node._left
+            elif node._key < key:
+                path.append((node, False))
+                node = node._right
+            else:
+                break
+        if node is None:
+            # key is not in the treap
+            return None
+
+        while node._left is not None and node._right is not None:
+            if node._left._priority > node._right._priority:
+                path.append((self._rotate_right(node), False))
+            else:
+                path.append((self._rotate_left(node), True))
+        replacement = node._right if node._left is None else node._left
+        self._height_total -= node._height
+        self._retrace(path, replacement)
+        return node
+
+    def _split(self, node, key, inclusive=False):
+        """
+        -------------------------------------------------------
+        Splits the subtree rooted at node at key in one pass down
+        the search path: each node on it goes to the low side (and
+        keeps its left subtree) or to the high side (and keeps its
+        right subtree), and the nodes of each side are chained in
+        the order met. Both sides stay heaps by priority.
+        Use: low, high = self._split(node, key)
+        -------------------------------------------------------
+        Parameters:
+            node - root of the subtree to split (TreapNode)
+            key - the key to split at (?)
+            inclusive - True to put a node with key on the low side (boolean)
+        Returns:
+            low - root of the elements with keys below key (TreapNode)
+            high - root of the other elements (TreapNode)
+        -------------------------------------------------------
+        """
+        lows = []
+        highs = []
+        while node is not None:
+            if node._key < key or (inclusive and not key < node._key):
+                lows.append(node)
+                node = node._right
+            else:
+                highs.append(node)
+                node = node._left
+
+        child = None
+        while lows:
+            parent = lows.pop()
+            parent._right = child
+            parent._update()
+            child = parent
+        low = child
+        child = None
+        while highs:
+            parent = highs.pop()
+            parent._left = child
+            parent._update()
+            child = parent
+        return low, child
+
+    def _join2(self, left, right):
+        """
+        -------------------------------------------------------
+        Merges the subtrees left and right, where every key in
+        left is smaller than every key in right, in one pass down
+        the right spine of left and the left spine of right: the
+        root of higher priority is taken each time.
+        Use: root = self._join2(left, right)
+        -------------------------------------------------------
+        Parameters:
+            left - root of a subtree of smaller elements (TreapNode)
+            right - root of a subtree of larger elements (TreapNode)
+        Returns:
+            root - the root of the merged subtree (TreapNode)
+        -------------------------------------------------------
+        """
+        # each entry is a taken node and whether it came from left
+        path = []
+        while left is not None and right is not None:
+            if left._priority > right._priority:
+                path.append((left, True))
+                left = left._right
+            else:
+                path.append((right, False))
+                right = right._left
+
+        node = right if left is None else left
+        while path:
+            parent, from_left = path.pop()
+            if from_left:
+                parent._right = node
+            else:
+                parent._left = node
+            parent._update()
+            node = parent
+        return node
+
+    def _build_balanced(self, nodes, low, high):
+        """
+        -------------------------------------------------------
+        Links nodes[low:high] into a perfectly balanced subtree,
+        as BST._build_balanced does. The outermost call then gives
+        the nodes fresh random priorities, in decreasing order
+        level by level, so that the tree is also a heap.
+        Use: node = self._build_balanced(nodes, low, high)
+        -------------------------------------------------------
+        Parameters:
+            nodes - unlinked nodes in increasing order (list of TreapNode)
+            low - index of the first node of the subtree (int)
+            high - index past the last node of the subtree (int)
+        Returns:
+            node - the root of the subtree, None if low >= high (TreapNode)
+        -------------------------------------------------------
+        """
+        root = BST._build_balanced(self, nodes, low, high)
+        if low > 0 or high < len(nodes):
+            # a recursive call for part of the nodes
+            return root
+
+        priorities = sorted((random() for _ in range(high - low)), reverse=True)
+        i = 0
+        level = [] if root is None else [root]
+        while level:
+            below = []
+            for node in level:
+                node._priority = priorities[i]
+                i += 1
+                if node._left is not None:
+                    below.append(node._left)
+                if node._right is not None:
+                    below.append(node._right)
+            level = below
+        return root
+
+    def extract_range(self, low, high):
+        """
+        -------------------------------------------------------
+        Removes the elements e with low <= e <= high (comparing
+        keys) from the treap and returns them as a new treap. Two
+        splits and one merge: O(log n) expected, however many
+        elements move.
+        Use: treap2 = treap.extract_range(low, high)
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound key of the range (?)
+            high - upper bound key of the range (?)
+        Returns:
+            target - a treap of the removed elements (Treap)
+        -------------------------------------------------------
+        """
+        below, rest = self._split(self._root, low)
+        middle, above = self._split(rest, high, inclusive=True)
+        self._root = self._join2(below, above)
+        self._stale = True
+        target = self._empty()
+        target._root = middle
+        target._stale = True
+        return target
+
+    def delete_range(self, low, high):
+        """
+        -------------------------------------------------------
+        Deletes the elements e with low <= e <= high (comparing
+        keys) from the treap. O(log n) expected.
+        Use: n = treap.delete_range(low, high)
+        -------------------------------------------------------
+        Parameters:
+            low - lower bound key of the range (?)
+            high - upper bound key of the range (?)
+        Returns:
+            n - number of elements deleted (int)
+        -------------------------------------------------------
+        """
+        return len(self.extract_range(low, high))
+
+    def is_consistent(self):
+        """
+        ---------------------------------------------------------
+        Checks the cached values as BST.is_consistent does, and
+        also that no node has a higher priority than its parent.
+        FOR TESTING: O(n).
+        Use: b = treap.is_consistent()
+        ---------------------------------------------------------
+        Returns:
+            consistent - True if the treap is consistent (boolean)
+        ---------------------------------------------------------
+        """
+        consistent = BST.is_consistent(self)
+        for node in self._nodes(self._root):
+            for child in (node._left, node._right):
+                if child is not None and child._priority > node._priority:
+                    consistent = False
+        return consistent